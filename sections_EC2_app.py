@@ -1,18 +1,60 @@
 import streamlit as st
-import plotly.graph_objects as go
-from matplotlib.figure import Figure
 import sections_EC2_module as sm
-from io import BytesIO
+import sections_EC2_plots as sp
+import sections_EC2_loads as sl
 import numpy as np
 import pandas as pd
-##Import analysis section
-from concreteproperties.results import MomentInteractionResults, MomentCurvatureResults
+from io import BytesIO
+from functools import partial
+import uuid
+
+#Results of previous sessions are reused from the on-disk store
+sm.open_result_store()
+
+#Load combinations exported by analysis programs, reduced to the governing ones
+
+@st.cache_data(max_entries=4, show_spinner="Importing load combinations")
+def import_file(data, name, kind, force_unit, moment_unit, tension_positive, column=None):
+    units = {"force": force_unit, "moment": moment_unit}
+    #a slender column is reduced on its design moments (slender_actions arguments)
+    second_order = {} if column is None else {
+        "transform": partial(sm.slender_actions, column[0], length=column[1], k=column[2],
+                             phi_ef=column[3]),
+        "moment": "MEd [kNm]"}
+    return sl.load_actions(BytesIO(data), kind=kind, fmt=sl.file_format(name),
+                           units={k: v for k, v in units.items() if v != "from header"},
+                           tension_positive=tension_positive, **second_order)
+
+
+def imported_actions(kind, column=None):
+    """
+    returns the combinations of an uploaded CSV/Parquet file, or None;
+    column is (section spec, length, k, phi_ef) of a slender column
+    """
+    upload = st.file_uploader(f"Import {kind.upper()} combinations (CSV/Parquet)",
+                              type=["csv", "parquet", "pq"], key=f"{kind}_file")
+    if upload is None:
+        return None
+    col1, col2 = st.columns(2)
+    force_unit = col1.selectbox("Force unit", ["from header", *sl.FORCE_UNITS], key=f"{kind}_force")
+    moment_unit = col2.selectbox("Moment unit", ["from header", *sl.MOMENT_UNITS], key=f"{kind}_moment")
+    tension_positive = st.checkbox("Tension positive in the file", key=f"{kind}_tension")
+    try:
+        df, info = import_file(upload.getvalue(), upload.name, kind,
+                               force_unit, moment_unit, tension_positive, column)
+    except (ValueError, ImportError) as exc:
+        st.error(f"{upload.name}: {exc}")
+        return None
+    st.caption(f"{info['kept']} of {info['read']} combinations kept ({info['reduce']})")
+    return df
 
 
 st.header("Reinforced Concrete Sections")
 st.subheader(f"Uniaxial bending")
 
-tab_geo, tab_mn, tab_cr, tab_cu = st.tabs(["Geometry","M-N Results", "Cracking", "Curvature"])
+#only the open tab is computed (on_change="rerun" gives each tab its .open state)
+tab_geo, tab_mn, tab_cr, tab_cu = st.tabs(["Geometry","M-N Results", "Cracking", "Curvature"],
+                                          key="tab", on_change="rerun")
 
 with st.sidebar:
     side_tab1, side_tab2, side_tab3 ,side_tab4= st.tabs(["Materials","Geometry", "ULS Actions", "SLS Actions"])
@@ -31,7 +73,7 @@ with st.sidebar:
                                      ))
        
         c_fc = float(concrete_grade[1:3])
-        concrete_serie = sm.concrete_EC2(c_fc)
+        concrete_serie = sm.concrete_props(c_fc)
         c_fct = concrete_serie.fctm
         c_E = concrete_serie.Ecm
         st.caption(f"Caracteristic compressive resistance = {c_fc} MPa")
@@ -49,6 +91,9 @@ with st.sidebar:
         section_type = st.selectbox("Section Type",("Rectangular",
                                      "Circular",
                                      ))
+        accuracy = st.selectbox("Accuracy", list(sm.ACCURACY_TIERS), index=1,
+                                help="Mesh of the section and resolution of the diagrams; "
+                                     "ULS cases close to 1 are always checked at final")
         st.subheader("Section Geometry")
         if section_type == "Rectangular":
             s_h = st.number_input("height [mm]", value=1000)
@@ -75,18 +120,43 @@ with st.sidebar:
                             "Side layer 2"]
             )
             edited_df = st.data_editor(bars_df)
-            diameters = edited_df.loc[:,"Bars diameter [mm]"]
-            areas = (np.pi*diameters**2)/4
-            modified_df = pd.concat([edited_df,areas],axis=1)
-            modified_df.columns=["Bars diameter [mm]",
-                                 "Number of bars",
-                                 "Cover [mm]",
-                                 "Area"]
         elif section_type == "Circular":
             b_diameter= st.number_input("Bars diameter [mm]",value = 25)
             b_nr_bars= st.number_input("Number of bars", value = 12 )
             cover = st.number_input("Cover [mm]", value=50)
 
+        st.subheader("Column")
+        slender = st.checkbox("Second order effects (EC2 5.8.8)",
+                              help="ULS moments are the larger first order end moments M02")
+        if slender:
+            col_length = st.number_input("Clear height [mm]", value=4000)
+            col_k = st.number_input("Effective length factor", value=1.0, step=0.1)
+            col_phi = st.number_input("Effective creep ratio", value=0.0, step=0.1)
+
+
+    #Define concrete section (before the actions: the ULS import of a slender column
+    #is reduced on its design moments)
+
+    if section_type == "Rectangular":
+        section_def = sm.section_spec(section_type=section_type,
+                                      fck=c_fc,
+                                      fy=s_fy,
+                                      height=s_h,
+                                      width=s_b,
+                                      rect_df=edited_df,
+                                      accuracy=accuracy,
+                                      )
+    elif section_type == "Circular":
+        section_def = sm.section_spec(section_type=section_type,
+                                      fck=c_fc,
+                                      fy=s_fy,
+                                      circ_diameter=s_d,
+                                      circ_cover=cover,
+                                      circ_n_bars=b_nr_bars,
+                                      circ_d_bars=b_diameter,
+                                      accuracy=accuracy,
+                                      )
+    column = (section_def, col_length, col_k, col_phi) if slender else None
 
     with side_tab3:
         st.caption("Compression is positive")
@@ -96,6 +166,16 @@ with st.sidebar:
         rows_actions = [["LC1",-100,900,300],["LC2",-200,750,150]]
         uls_act_df = pd.DataFrame(data=rows_actions, columns=columns_actions)
         edited_uls_act_df= st.data_editor(uls_act_df, num_rows="dynamic")
+        uls_imported = imported_actions("uls", column)
+        if uls_imported is not None:
+            edited_uls_act_df = sl.unique_cases(pd.concat([edited_uls_act_df, uls_imported],
+                                                          ignore_index=True))
+
+        st.caption("Biaxial actions")
+        columns_biax = ["Load Case","N [kN]", "Mx [kNm]", "My [kNm]" ]
+        biax_act_df = pd.DataFrame(columns=columns_biax).astype(
+            {"Load Case":str, "N [kN]":float, "Mx [kNm]":float, "My [kNm]":float})
+        edited_biax_df= st.data_editor(biax_act_df, num_rows="dynamic")
               
 
     with side_tab4:
@@ -105,153 +185,267 @@ with st.sidebar:
         rows_sls = [["LC1",-100,500]]
         sls_act_df = pd.DataFrame(data=rows_sls, columns=columns_sls)
         edited_sls_df= st.data_editor(sls_act_df.set_index("Load Case"))
-
-
-#Define materials
-concrete = sm.create_concrete(fc=concrete_serie.fck,
-                              fcm=concrete_serie.fcm,
-                              fc_t=concrete_serie.fctm,
-                              E=concrete_serie.Ecm,
-                              eps_cu1=concrete_serie.eps_cu1,
-                              eps_c1=concrete_serie.eps_c1,
-                              eps_cu2=concrete_serie.eps_cu2,
-                              eps_c2=concrete_serie.eps_c2,
-                              n=concrete_serie.n)
-steel_rebar=sm.create_steelbar(fy=s_fy,gamma_r=1.15)
-
-#Define concrete geometry
-
-if section_type == "Rectangular":
-    conc_section = sm.concrete_section( section_type=section_type,
-                                    height=s_h,
-                                    width=s_b,
-                                    bar_mat=steel_rebar,
-                                    concrete_mat=concrete,
-                                    rect_df=modified_df,
-                                       )
-elif section_type == "Circular":
-    conc_section = sm.concrete_section( section_type=section_type,
-                                    bar_mat=steel_rebar,
-                                    concrete_mat=concrete,
-                                    circ_diameter=s_d,
-                                    circ_cover=cover,
-                                    circ_n_bars=b_nr_bars,
-                                    circ_d_bars=b_diameter,
-                                       )
-
-
-#Actions
+        sls_imported = imported_actions("sls")
+        if sls_imported is not None:
+            edited_sls_df = sl.unique_cases(pd.concat([edited_sls_df.reset_index(), sls_imported],
+                                                      ignore_index=True)).set_index("Load Case")
+
+    with st.expander("Diagnostics"):
+        diagnostics = st.checkbox("Record stage timings")
+        profile_run = st.button("Profile one run")
+        if st.button("Reset timings"):
+            sm.reset_timing()
+        diag_box = st.container()
+
+#Timings are recorded by the module stages, the profiler covers the rest of this run
+sm.enable_timing(diagnostics)
+prof = sm.profiler().start() if profile_run else None
+
+
+#Actions (with the second order moments of a slender column)
+slender_df = None
+if slender:
+    slender_df = sm.slender_actions(section_def, edited_uls_act_df, col_length, col_k, col_phi)
 n_actions = list(edited_uls_act_df["N [kN]"])
-m_actions = list(edited_uls_act_df["M [kNm]"])
+m_actions = list(edited_uls_act_df["M [kNm]"] if slender_df is None else slender_df["MEd [kNm]"])
 lc_actions = list(edited_uls_act_df["Load Case"])
 
 
-#Caclutate Mr for each N 
-capacity_list=[]
-for i  in range(len(lc_actions)):
-    if m_actions[i]>0:
-        mr = conc_section.ultimate_bending_capacity(theta=0, n= n_actions[i]*1e3)
-    else:
-        mr = conc_section.ultimate_bending_capacity(theta=np.pi, n= n_actions[i]*1e3)
-    capacity_list.append([lc_actions[i], 
-                          n_actions[i], 
-                          m_actions[i],
-                          (mr.m_xy/1e6).round(1), 
-                          abs(m_actions[i]/(mr.m_xy/1e6)).round(3)])
-
-
-#Calculate Cracked Section
-if edited_sls_df.iloc[0][1] >0:
-    cracked_res = conc_section.calculate_cracked_properties(theta=0)
-else:
-    cracked_res = conc_section.calculate_cracked_properties(theta=np.pi)
-cracked_stress_res = conc_section.calculate_cracked_stress(
-    cracked_results=cracked_res,
-    n= edited_sls_df.iloc[0][0]*1e3, 
-    m=edited_sls_df.iloc[0][1]*1e6
-)
-
-#print N-M curve with actions
-m_n_0=conc_section.moment_interaction_diagram(theta=0)
-m_n_180=conc_section.moment_interaction_diagram(theta=np.pi)
+#Analyses of each tab: they run in a background job only when the tab is
+#open, the tab shows a progress state until the job is done
+
+def uls_results(section_def, n_actions, m_actions, lc_actions):
+    """
+    returns the M-N diagrams, the check of each ULS action and the
+    governing case
+    """
+    m_n_0, m_n_180 = sm.run_analyses([
+        (section_def, "adaptive_interaction_diagram", {"theta":0}),
+        (section_def, "adaptive_interaction_diagram", {"theta":np.pi}),
+    ])
+    #Bounds on the shared M-N diagrams, exact Mr only where they cannot decide,
+    #cases close to 1 again at the final accuracy
+    check_df, check_info = sm.tiered_uls_check(section_def,
+                                               n_actions,
+                                               m_actions,
+                                               load_cases=lc_actions,
+                                               max_workers=None)
+    return m_n_0, m_n_180, check_df, check_info
+
+
+def biaxial_results(section_def, biax_df):
+    """
+    returns the biaxial checks on the N-Mx-My capacity surface
+    """
+    surface = sm.biaxial_capacity_surface(section_def)
+    biax_mr, biax_ut = sm.biaxial_check(surface,
+                                        biax_df["N [kN]"],
+                                        biax_df["Mx [kNm]"],
+                                        biax_df["My [kNm]"])
+    return biax_df.assign(**{"Mrd [kNm]":biax_mr.round(1),
+                             "Utilization Level":biax_ut.round(3)})
+
+
+def cracked_stress(section_def, n_action, m_action):
+    """
+    returns the cracked stresses of the section under one SLS case
+    """
+    theta = 0 if m_action > 0 else np.pi
+    cracked_res = sm.cached_analysis(section_def, "calculate_cracked_properties", theta=theta)
+    return sm.cached_section(section_def).calculate_cracked_stress(cracked_results=cracked_res,
+                                                                   n=n_action*1e3,
+                                                                   m=m_action*1e6)
+
+
+@st.fragment(run_every=0.5)
+def wait_for(job, label):
+    """
+    shows a progress state until job is done, then reruns the app
+    """
+    if job.done():
+        st.rerun()
+    with st.status(f"{label} ({job.elapsed():.0f} s)", state="running"):
+        if job.state == "pending":
+            st.write(f"Queued, {sm.queue_stats()['queued']} jobs waiting")
+        st.write("The results are shown as soon as they are ready")
+
+
+#Jobs are shared by all the sessions: the same section and actions run once,
+#the checks of the ULS/SLS tables go before the heavy diagrams, and a job
+#is cancelled when its session asks for other inputs
+JOB_PRIORITY = {"section": sm.PRIORITY_HIGH, "stress": sm.PRIORITY_HIGH,
+                "uls": sm.PRIORITY_HIGH, "sls": sm.PRIORITY_HIGH,
+                "biaxial": sm.PRIORITY_NORMAL, "curvature": sm.PRIORITY_LOW,
+                "sweep": sm.PRIORITY_LOW}
+session_id = st.session_state.setdefault("session_id", uuid.uuid4().hex)
+
+
+def job_result(key, label, fn, *args):
+    """
+    returns the result of fn(*args), or None while it is computed in the
+    background (and the progress is shown)
+    """
+    job = sm.background_job((section_def.key,)+key, fn, *args,
+                            priority=JOB_PRIORITY[key[0]],
+                            owner=(session_id, key[0]))
+    if not job.done():
+        wait_for(job, label)
+        return None
+    return job.result()
 
-#Tabs display:
 
-with tab_geo:
-    fig = Figure()
-    ax = fig.gca()
-    ax = conc_section.plot_section()
-    fig=ax.get_figure()
-
-    temp_fig= BytesIO()
-    fig.savefig(temp_fig, format="png")
-    st.image(temp_fig)
+#Tabs display:
 
-    
-with tab_mn:
-  
-    fig = Figure()
-    ax = fig.gca()
-    ax = MomentInteractionResults.plot_multiple_diagrams(
-    moment_interaction_results=[m_n_0, m_n_180],
-    labels=["Positive", "Negative"],
-    fmt="-",
-    )
-    legend_list = ["Positive", "Negative"] + lc_actions
-    for i in range(len(m_actions)):
-        ax.scatter(x=m_actions[i], y=n_actions[i])
-    for element in legend_list:
-        ax.legend(legend_list)
-
-
-    fig=ax.get_figure()
-    temp_fig= BytesIO()
-    fig.savefig(temp_fig, format="png")
-    st.image(temp_fig)
-
-    columns_capacity = ["Load Case","Ned [kN]", "Med [kNm]", "Mrd [kNm]", "Utilization Level"]
-    capacity_df = pd.DataFrame(data=capacity_list, columns=columns_capacity)
-    # capacity_df = capacity_df.set_index("Load Case")
-    printed_capacity_df= st.dataframe(capacity_df,use_container_width=True)
-
-
-with tab_cr:
-    st.caption("Compression stress is positive")
-    
-    fig = Figure()
-    ax = fig.gca()
-    ax = cracked_stress_res.plot_stress()
-    fig=ax.get_figure()
-    temp_fig= BytesIO()
-    fig.savefig(temp_fig, format="png")
-    st.image(temp_fig)
-
-    cracked_df = sm.get_stress_df(cracked_stress_res)
-    edited_cracked_df = st.dataframe(cracked_df,use_container_width=True)
-
-   # st.write(f"Depth of neutral axis is equal to {cracked_res.d_nc:.2f} mm")
-
-
-
-with tab_cu:
-
-    option = st.selectbox(
-    'Moment-curvature calculation?',
-    ('NO', 'YES'))
-    if option == "YES":
-        n_action= st.number_input("ULS Axial force [kN]",value=200)
-        #print Moment curvature
-        m_c_0 = conc_section.moment_curvature_analysis(theta=0, n=n_action*1e3)
-        m_c_180 = conc_section.moment_curvature_analysis(theta=np.pi, n=n_action*1e3)
-
-        fig = Figure()
-        ax = fig.gca()
-        ax = MomentCurvatureResults.plot_multiple_results(
-        moment_curvature_results=[m_c_0, m_c_180],
-        labels=["Positive", "Negative"],
-        fmt="-",
-        )
-        fig=ax.get_figure()
-        temp_fig= BytesIO()
-        fig.savefig(temp_fig, format="png")
-        st.image(temp_fig)
\ No newline at end of file
+if tab_geo.open:
+    with tab_geo:
+        #the section is built (or taken from the cache) in the background too
+        conc_section = job_result(("section",), "Building the section",
+                                  sm.cached_section, section_def)
+        if conc_section is not None:
+            with sm.stage("app.plot.section"):
+                fig = sp.section_figure(conc_section)
+            st.plotly_chart(fig, use_container_width=True)
+
+        
+if tab_mn.open:
+    with tab_mn:
+        uls_res = job_result(("uls", tuple(n_actions), tuple(m_actions), tuple(lc_actions)),
+                             "Computing the M-N diagrams",
+                             uls_results, section_def, n_actions, m_actions, lc_actions)
+        #Biaxial checks on the N-Mx-My capacity surface (only if there are biaxial actions)
+        biax_df = edited_biax_df.dropna(subset=["N [kN]"]).fillna({"Mx [kNm]":0, "My [kNm]":0})
+        biax_capacity_df = None
+        if len(biax_df) > 0:
+            biax_capacity_df = job_result(("biaxial", biax_df.to_json()),
+                                          "Computing the biaxial capacity surface",
+                                          biaxial_results, section_def, biax_df)
+
+        if uls_res is not None:
+            m_n_0, m_n_180, check_df, check_info = uls_res
+
+            with sm.stage("app.plot.interaction"):
+                fig = sp.interaction_figure([m_n_0, m_n_180],
+                                            labels=["Positive", "Negative"],
+                                            n_actions=n_actions,
+                                            m_actions=m_actions,
+                                            lc_actions=lc_actions)
+            st.plotly_chart(fig, use_container_width=True)
+
+            if check_info["governing"] is not None:
+                st.caption(f"Governing load case: {check_info['governing']} "
+                           f"(utilization {check_info['utilisation']:.3f}, "
+                           f"{check_info['exact solves']} exact capacity solves)")
+                st.caption(f"Accuracy {check_info['accuracy']}: estimated error "
+                           f"{check_info['error estimate']:.2%} against final, "
+                           f"{check_info['final reruns']} cases close to 1 checked at final")
+            capacity_df = check_df.rename(columns={"N [kN]":"Ned [kN]", "M [kNm]":"Med [kNm]"})
+            capacity_df = capacity_df.round({"Mrd [kNm]":1, "Utilization Level":3,
+                                             "Utilization lower bound":3, "Error estimate":3})
+            printed_capacity_df= st.dataframe(capacity_df,use_container_width=True)
+            if slender_df is not None:
+                st.caption("Second order effects: Med is MEd = max(M0e+M2, M02, M01+M2/2), imperfections included")
+                st.dataframe(slender_df.drop(columns=["V [kN]"]).round(
+                    {"Slenderness":1, "Limit slenderness":1, "M2 [kNm]":1, "MEd [kNm]":1}),
+                    use_container_width=True)
+
+        if biax_capacity_df is not None:
+            st.caption("Biaxial bending: Mrd is the capacity along the direction of (Mx, My)")
+            st.dataframe(biax_capacity_df,use_container_width=True)
+
+        with st.expander("Design sweep (rectangular sections)"):
+            st.caption("Candidates with the same top and bottom layer, checked against the ULS actions")
+            sweep_h = st.text_input("Heights [mm]", "400, 500, 600, 700")
+            sweep_b = st.text_input("Widths [mm]", "300, 400, 500")
+            sweep_d = st.text_input("Bars diameters [mm]", "16, 20, 25")
+            sweep_nr = st.text_input("Numbers of bars per layer", "3, 4, 5, 6")
+            sweep_fck = st.text_input("Concrete fck [MPa]", f"{c_fc:g}")
+            sweep_cover = st.number_input("Cover to the bar axis [mm]", value=50)
+            if st.button("Run sweep"):
+                st.session_state["sweep"] = (sweep_h, sweep_b, sweep_d, sweep_nr, sweep_fck, sweep_cover)
+            #The last sweep asked for runs in the background, as the other analyses
+            sweep_df = None
+            if "sweep" in st.session_state:
+                to_list = lambda text: [float(v) for v in text.replace(";", ",").split(",") if v.strip()]
+                inputs = st.session_state["sweep"]
+                specs = sm.sweep_specs(heights=to_list(inputs[0]),
+                                       widths=to_list(inputs[1]),
+                                       diameters=to_list(inputs[2]),
+                                       counts=[int(v) for v in to_list(inputs[3])],
+                                       fcks=to_list(inputs[4]),
+                                       fy=s_fy,
+                                       cover=inputs[5])
+                #Checked against the actions of the M-N check (MEd of a slender column)
+                sweep_uls_df = pd.DataFrame({"Load Case":lc_actions, "N [kN]":n_actions, "M [kNm]":m_actions})
+                sweep_df = job_result(("sweep", inputs, s_fy, sweep_uls_df.to_json()),
+                                      f"Checking {len(specs)} candidates",
+                                      sm.design_sweep, specs, sweep_uls_df)
+            if sweep_df is not None:
+                st.write("Pareto front of steel area vs concrete area")
+                st.dataframe(sweep_df[sweep_df["Pareto"]],use_container_width=True)
+                st.write("All candidates")
+                st.dataframe(sweep_df,use_container_width=True)
+
+
+if tab_cr.open:
+    with tab_cr:
+        st.caption("Compression stress is positive")
+        #Calculate Cracked Section for all the SLS cases
+        sls_df = edited_sls_df.reset_index()
+        sls_results_df = job_result(("sls", sls_df.to_json()),
+                                    "Computing the cracked section",
+                                    sm.sls_batch, section_def, sls_df)
+        if sls_results_df is not None:
+            st.dataframe(sls_results_df.set_index("Load Case"),use_container_width=True)
+
+            sls_case = st.selectbox("Load case to plot", sls_df["Load Case"])
+            sls_row = sls_df.set_index("Load Case").loc[sls_case]
+            cracked_stress_res = job_result(("stress", sls_row["N [kN]"], sls_row["M [kNm]"]),
+                                            f"Computing the stresses of {sls_case}",
+                                            cracked_stress, section_def,
+                                            sls_row["N [kN]"], sls_row["M [kNm]"])
+            if cracked_stress_res is not None:
+                with sm.stage("app.plot.stress"):
+                    fig = sp.stress_figure(cracked_stress_res)
+                st.plotly_chart(fig, use_container_width=True)
+
+                cracked_df = sm.get_stress_df(cracked_stress_res)
+                edited_cracked_df = st.dataframe(cracked_df,use_container_width=True)
+
+       # st.write(f"Depth of neutral axis is equal to {cracked_res.d_nc:.2f} mm")
+
+
+
+if tab_cu.open:
+    with tab_cu:
+
+        option = st.selectbox(
+        'Moment-curvature calculation?',
+        ('NO', 'Fibre model (fast)', 'Meshed section (exact)'))
+        if option != "NO":
+            n_action= st.number_input("ULS Axial force [kN]",value=200)
+            analysis = ("fibre_moment_curvature" if option.startswith("Fibre")
+                        else "moment_curvature_analysis")
+            #print Moment curvature
+            m_c = job_result(("curvature", analysis, n_action),
+                             "Computing the moment-curvature diagrams",
+                             sm.run_analyses, [
+                (section_def, analysis, {"theta":0, "n":n_action*1e3}),
+                (section_def, analysis, {"theta":np.pi, "n":n_action*1e3}),
+            ])
+        if option != "NO" and m_c is not None:
+            m_c_0, m_c_180 = m_c
+            with sm.stage("app.plot.curvature"):
+                fig = sp.curvature_figure([m_c_0, m_c_180], labels=["Positive", "Negative"])
+            st.plotly_chart(fig, use_container_width=True)
+
+
+#Diagnostics
+if prof is not None:
+    with st.expander(f"Profile of this run ({prof.kind})", expanded=True):
+        st.code(prof.stop())
+if diagnostics:
+    with diag_box:
+        st.dataframe(sm.timing_report(),use_container_width=True)
+        st.dataframe(sm.cache_report(),use_container_width=True)
+        st.dataframe(pd.DataFrame([sm.queue_stats()]),use_container_width=True)
+        st.dataframe(sm.queue_report(),use_container_width=True)
@@ -0,0 +1,205 @@
+"""
+Headless batch analysis of many sections, without Streamlit.
+
+    python sections_EC2_batch.py project.json -o results.csv --workers 8
+
+The input is a JSON list of sections, e.g.
+
+    [{"name": "C1",
+      "concrete_grade": "C30/37",
+      "steel_grade": "B450C",
+      "section_type": "Rectangular",
+      "height": 500, "width": 500,
+      "bars": {"Top layer 1": {"Bars diameter [mm]": 25, "Number of bars": 4, "Cover [mm]": 50},
+               ...},
+      "uls": [["LC1", -100, 900, 300], ...],
+      "sls": [["LC1", -100, 500], ...]},
+     {"name": "P1",
+      "concrete_grade": "C40/50",
+      "steel_grade": "B500C",
+      "section_type": "Circular",
+      "diameter": 600, "cover": 40, "bars_diameter": 20, "n_bars": 12,
+      "uls": [...], "sls": [...]}]
+
+"bars" is the bar table of the app (rect_df layout, layer name -> row),
+"uls" and "sls" are the rows of the app action tables (lists in column
+order or dicts keyed by column name), or a CSV/Parquet export read with
+sections_EC2_loads.load_actions: its path, or a dict with "file" and the
+load_actions options, e.g. {"file": "c1.csv", "units": {"force": "N"}}.
+"accuracy" (optional) is one of sections_EC2_module.ACCURACY_TIERS,
+"standard" by default; ULS cases close to 1 are checked at "final".
+"column" (optional) makes the section a slender column, e.g.
+{"length": 4000, "k": 1.0, "phi_ef": 1.5, "r_m": 0.5} (see
+sections_EC2_module.slender_actions): the ULS moments are then the design
+moments with the second order effects of EC2 5.8.8, and a ULS file is
+reduced on these design moments.
+Results are appended to the output csv as soon as each section finishes;
+analysis results are kept in the on-disk result store (see --store), so
+sections already analysed in a previous run are not recomputed
+(--prune-store removes the results of other versions of the tool).
+With --log-json one JSON line per section is written with its status,
+wall time, stage timings and cache statistics; --profile profiles the
+run (use it with --workers 1, the workers are not profiled).
+"""
+import argparse
+import json
+import sys
+import time
+import traceback
+from concurrent.futures import as_completed
+from functools import partial
+from typing import Optional
+import pandas as pd
+import sections_EC2_module as sm
+import sections_EC2_loads as sl
+
+
+def read_project(path:str)->list[dict]:
+    with open(path) as f:
+        return json.load(f)
+
+
+def action_df(rows:list, columns:list[str])->pd.DataFrame:
+    """
+    returns an action table from rows given as lists or as dicts
+    """
+    rows = [[row.get(col) for col in columns] if isinstance(row, dict) else row
+            for row in rows]
+    return pd.DataFrame(data=rows, columns=columns)
+
+
+def item_actions(value, kind:str, second_order=None)->pd.DataFrame:
+    """
+    returns the ULS or SLS (kind) action table of a project item: rows,
+    or a file (path or dict of load_actions options with "file").
+    second_order (chunk -> chunk with "MEd [kNm]") gives the design moments
+    a ULS file is reduced on
+    """
+    columns = sm.ULS_COLUMNS if kind == "uls" else sm.SLS_COLUMNS
+    if isinstance(value, str):
+        value = {"file": value}
+    if isinstance(value, dict):
+        options = dict(value)
+        if second_order is not None:
+            options.update(transform=second_order, moment="MEd [kNm]")
+        return sl.load_actions(options.pop("file"), kind=kind, **options)[0]
+    return action_df(value, columns)
+
+
+def section_inputs(item:dict)->tuple[str, sm.SectionSpec, pd.DataFrame, pd.DataFrame]:
+    """
+    returns name, SectionSpec, ULS and SLS dataframes of one project item
+    """
+    name = str(item["name"])
+    fck = sm.grade_fck(item.get("concrete_grade", "C25/30"))
+    fy = sm.grade_fy(item.get("steel_grade", "B450C"))
+    if item["section_type"] == "Rectangular":
+        rect_df = pd.DataFrame.from_dict(item["bars"], orient="index")
+        spec = sm.section_spec(section_type="Rectangular",
+                               fck=fck,
+                               fy=fy,
+                               height=item["height"],
+                               width=item["width"],
+                               rect_df=rect_df,
+                               accuracy=item.get("accuracy", "standard"))
+    else:
+        spec = sm.section_spec(section_type="Circular",
+                               fck=fck,
+                               fy=fy,
+                               circ_diameter=item["diameter"],
+                               circ_cover=item["cover"],
+                               circ_n_bars=item["n_bars"],
+                               circ_d_bars=item["bars_diameter"],
+                               accuracy=item.get("accuracy", "standard"))
+    column = item.get("column")
+    second_order = partial(sm.slender_actions, spec, **column) if column else None
+    uls_df = item_actions(item.get("uls", []), "uls", second_order)
+    sls_df = item_actions(item.get("sls", []), "sls")
+    return name, spec, uls_df, sls_df
+
+
+def run_item(item:dict, store:Optional[str]=None, log:bool=False)->tuple[pd.DataFrame, dict]:
+    """
+    analyses one project item and returns the result table and a log
+    record; errors are reported as a result row so that one bad section
+    does not stop the whole run.
+    store is the path of the on-disk result store, if used;
+    with log the record has the stage timings and cache statistics
+    """
+    if log:
+        sm.enable_timing(True)
+        sm.reset_timing()
+    t0 = time.perf_counter()
+    record = {"section": str(item.get("name")), "status": "ok"}
+    try:
+        if store:
+            sm.open_result_store(store)
+        df = sm.analyse_section(*section_inputs(item), max_workers=1,
+                                column=item.get("column"))
+    except Exception as exc:
+        row = {col: None for col in sm.RESULT_COLUMNS}
+        row.update({"Section": str(item.get("name")), "Limit State": "ERROR",
+                    "Load Case": f"{type(exc).__name__}: {exc}"})
+        traceback.print_exc(file=sys.stderr)
+        df = pd.DataFrame([row], columns=sm.RESULT_COLUMNS)
+        record.update({"status": "error", "error": f"{type(exc).__name__}: {exc}"})
+    record.update({"wall_s": round(time.perf_counter()-t0, 6), "rows": len(df)})
+    if log:
+        record.update({"stages": sm.timing_stats(), "caches": sm.cache_stats()})
+    return df, record
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Batch EC2 section checks")
+    parser.add_argument("project", help="JSON file with the list of sections")
+    parser.add_argument("-o", "--output", default="results.csv",
+                        help="csv file for the result table")
+    parser.add_argument("-w", "--workers", type=int, default=None,
+                        help="number of worker processes (default: all CPUs)")
+    parser.add_argument("--store", default=None,
+                        help="on-disk result store (default: SECTIONS_EC2_STORE or ~/.cache/sections_EC2/results.sqlite)")
+    parser.add_argument("--no-store", action="store_true",
+                        help="do not read or write the on-disk result store")
+    parser.add_argument("--prune-store", action="store_true",
+                        help="remove the results of other versions from the result store")
+    parser.add_argument("--log-json", default=None, metavar="PATH",
+                        help="write one JSON line per section with timings and cache statistics")
+    parser.add_argument("--profile", action="store_true",
+                        help="profile the run and print the report to stderr")
+    args = parser.parse_args(argv)
+    prof = sm.profiler().start() if args.profile else None
+    log = args.log_json is not None
+    store = None if args.no_store else sm.open_result_store(args.store).path
+    if store and args.prune_store:
+        print(f"{sm.result_store.prune()} results of other versions removed", file=sys.stderr)
+
+    items = read_project(args.project)
+    header = True
+    n_errors = 0
+    log_file = open(args.log_json, "w") if log else None
+    with open(args.output, "w", newline="") as out:
+        if args.workers == 1:
+            results = (run_item(item, store, log) for item in items)
+        else:
+            pool = sm.get_executor(args.workers)
+            results = (f.result() for f in as_completed(pool.submit(run_item, item, store, log)
+                                                        for item in items))
+        for i, (df, record) in enumerate(results, start=1):
+            n_errors += (df["Limit State"] == "ERROR").sum()
+            df.to_csv(out, header=header, index=False)
+            out.flush()
+            header = False
+            if log_file:
+                log_file.write(json.dumps(record)+"\n")
+                log_file.flush()
+            print(f"[{i}/{len(items)}] {record['section']}", file=sys.stderr)
+    if log_file:
+        log_file.close()
+    sm.shutdown_executor()
+    if prof is not None:
+        print(prof.stop(), file=sys.stderr)
+    return 1 if n_errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
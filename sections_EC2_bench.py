@@ -0,0 +1,381 @@
+"""
+Benchmarks of section construction and of every analysis type.
+
+    python sections_EC2_bench.py                      # quick suite
+    python sections_EC2_bench.py --suite full -o bench.json
+    python sections_EC2_bench.py --save-baseline bench_baseline.json
+    python sections_EC2_bench.py --compare bench_baseline.json --threshold 0.2
+    python sections_EC2_bench.py --startup            # import times and budget
+
+Each case is a rectangular or circular section with a given number of
+bars, mesh density (points of the circle and of each bar) and number of
+load cases. For every stage the wall time (best of --repeat runs), the
+peak memory allocated by Python and NumPy (tracemalloc, in a separate
+run) and the throughput (load cases/s) are reported.
+The caches and the result store are not used, so every stage is
+computed; load cases are drawn with a fixed seed.
+With --compare the run is checked against a baseline and the exit code
+is 1 if any stage is slower than the baseline by more than --threshold.
+With --startup the import of each module of the app, of the batch tool
+and of a spawned pool worker is timed in a fresh interpreter instead;
+the exit code is 1 if one takes longer than STARTUP_BUDGET or loads one
+of LAZY_MODULES.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Optional
+import numpy as np
+import pandas as pd
+import sections_EC2_module as sm
+
+## Suites: (section type, bars per layer or bars of the circle, mesh points
+## of the circle, points of each bar, number of load cases)
+
+SUITES = {
+    "quick": [("Rectangular", 4, 36, 4, 10),
+              ("Rectangular", 8, 36, 4, 100),
+              ("Circular", 12, 36, 4, 10),
+              ("Circular", 24, 72, 8, 100)],
+    "full": [("Rectangular", 4, 36, 4, 10),
+             ("Rectangular", 8, 36, 4, 100),
+             ("Rectangular", 16, 36, 8, 1000),
+             ("Circular", 8, 24, 4, 10),
+             ("Circular", 16, 36, 4, 100),
+             ("Circular", 32, 72, 8, 1000)],
+}
+
+## stages that are only run in the full suite (slow)
+SLOW_STAGES = ("moment_curvature_analysis",)
+
+## Startup: seconds allowed for each stage of run_startup, and the
+## libraries that must only be loaded by the analyses that use them
+STARTUP_BUDGET = {"import sections_EC2_module": 0.8,
+                  "import sections_EC2_loads": 0.8,
+                  "import sections_EC2_plots": 0.5,
+                  "import sections_EC2_batch": 0.9,
+                  "spawn worker": 1.5,
+                  "first section": 3.0}
+LAZY_MODULES = ("concreteproperties", "sectionproperties", "shapely", "matplotlib", "scipy")
+
+STARTUP_CODE = """
+import sys, time
+t = time.perf_counter()
+{code}
+wall = time.perf_counter()-t
+print(wall)
+print(",".join(m for m in {lazy!r} if m in sys.modules))
+"""
+
+
+def case_name(case:tuple)->str:
+    section_type, n_bars, circ_n, bar_n, n_cases = case
+    return f"{section_type[:4].lower()}-{n_bars}bars-c{circ_n}-b{bar_n}-{n_cases}lc"
+
+
+def case_section(case:tuple)->dict:
+    """
+    returns the arguments of concrete_section for a case
+    """
+    section_type, n_bars, circ_n, bar_n, _ = case
+    concrete = sm.cached_concrete(30)
+    steel = sm.cached_steelbar(450)
+    if section_type == "Rectangular":
+        rect_df = pd.DataFrame(
+            data={"Bars diameter [mm]": [25, 25, 20],
+                  "Number of bars": [n_bars, n_bars, 2],
+                  "Cover [mm]": [50, 50, 50]},
+            index=["Top layer 1", "Bottom layer 1", "Side layer 1"])
+        return {"section_type": section_type,
+                "bar_mat": steel,
+                "concrete_mat": concrete,
+                "height": 1000,
+                "width": 1000,
+                "rect_df": rect_df,
+                "bar_n": bar_n}
+    return {"section_type": section_type,
+            "bar_mat": steel,
+            "concrete_mat": concrete,
+            "circ_diameter": 1000,
+            "circ_cover": 60,
+            "circ_n_bars": n_bars,
+            "circ_d_bars": 25,
+            "circ_n": circ_n,
+            "bar_n": bar_n}
+
+
+def load_cases(n_cases:int, seed:int=0)->pd.DataFrame:
+    """
+    returns n_cases random load cases (ULS_COLUMNS) within the capacity
+    of the benchmark sections
+    """
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({"Load Case": [f"LC{i+1}" for i in range(n_cases)],
+                         "N [kN]": rng.uniform(-1000, 8000, n_cases),
+                         "M [kNm]": rng.uniform(-1500, 1500, n_cases),
+                         "V [kN]": np.zeros(n_cases)})
+
+
+def stages(case:tuple, full:bool)->list[tuple[str, int, object]]:
+    """
+    returns the stages of a case as (name, number of load cases, fn);
+    fn runs the stage from scratch
+    """
+    kwargs = case_section(case)
+    section = sm.concrete_section(**kwargs)
+    cases = load_cases(case[4])
+    n = cases["N [kN]"].to_numpy()*1e3
+    m = cases["M [kNm]"].to_numpy()*1e6
+    cracked = section.calculate_cracked_properties()
+    n_ubc = min(len(n), 10)
+    spec_kwargs = {key: kwargs[key] for key in kwargs
+                   if key not in ("bar_mat", "concrete_mat", "bar_n", "circ_n")}
+    spec = sm.section_spec(fck=30, fy=450, **spec_kwargs)
+
+    def cracked_stress():
+        for n_i, m_i in zip(n, m):
+            section.calculate_cracked_stress(cracked_results=cracked, n=n_i, m=abs(m_i))
+
+    def uls_batch():
+        sm.batch_uls_check(section, cases["N [kN]"], cases["M [kNm]"])
+
+    def uls_governing():
+        sm.governing_uls_check(section, cases["N [kN]"], cases["M [kNm]"])
+
+    def sls_batch():
+        # the case section (with its mesh) stands for spec, the cracked
+        # properties are computed again at every run
+        sm.section_cache.put(spec.key, section)
+        sm.result_cache.clear()
+        sm.sls_batch(spec, cases)
+
+    result = [
+        ("concrete_section", 0, lambda: sm.concrete_section(**kwargs)),
+        ("moment_interaction_diagram", 0,
+         lambda: section.moment_interaction_diagram(progress_bar=False)),
+        ("adaptive_interaction_diagram", 0,
+         lambda: sm.adaptive_interaction_diagram(section)),
+        ("ultimate_bending_capacity", n_ubc,
+         lambda: [section.ultimate_bending_capacity(n=n_i) for n_i in n[:n_ubc]]),
+        ("batch_uls_check", len(n), uls_batch),
+        ("governing_uls_check", len(n), uls_governing),
+        ("calculate_cracked_properties", 0, section.calculate_cracked_properties),
+        ("calculate_cracked_stress", len(n), cracked_stress),
+        ("sls_batch", len(n), sls_batch),
+    ]
+    if full:
+        result.append(("moment_curvature_analysis", 0,
+                       lambda: section.moment_curvature_analysis(n=0, progress_bar=False)))
+    return result
+
+
+def measure(fn, repeat:int=3, memory:bool=True)->tuple[float, Optional[float]]:
+    """
+    returns the best wall time [s] of repeat runs of fn and the peak
+    memory [MB] allocated during one more traced run
+    """
+    times = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        times.append(time.perf_counter()-t)
+    peak = None
+    if memory:
+        tracemalloc.start()
+        try:
+            fn()
+            peak = tracemalloc.get_traced_memory()[1]/2**20
+        finally:
+            tracemalloc.stop()
+    return min(times), peak
+
+
+def run_suite(suite:str="quick", repeat:int=3, memory:bool=True, only:Optional[list[str]]=None)->dict:
+    """
+    returns the benchmark report of a suite: metadata and one row per
+    (case, stage)
+    """
+    # every stage computed from scratch
+    sm.result_store = None
+    sm.section_cache.clear()
+    sm.result_cache.clear()
+    rows = []
+    for case in SUITES[suite]:
+        name = case_name(case)
+        for stage, n_cases, fn in stages(case, full=suite == "full"):
+            if only and stage not in only:
+                continue
+            reps = 1 if stage in SLOW_STAGES else repeat
+            wall, peak = measure(fn, repeat=reps, memory=memory and stage not in SLOW_STAGES)
+            rows.append({"case": name,
+                         "stage": stage,
+                         "wall_s": round(wall, 6),
+                         "peak_mb": None if peak is None else round(peak, 2),
+                         "load_cases": n_cases,
+                         "per_s": round(n_cases/wall, 1) if n_cases else None})
+            print(f"{name:32s} {stage:30s} {wall:9.4f} s", file=sys.stderr, flush=True)
+            sm.result_cache.clear()
+    return {"meta": {"suite": suite,
+                     "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                     "python": platform.python_version(),
+                     "platform": platform.platform(),
+                     "machine": platform.machine(),
+                     "concreteproperties": sm._package_version("concreteproperties"),
+                     "sectionproperties": sm._package_version("sectionproperties"),
+                     "numpy": np.__version__,
+                     "store_version": sm.store_version()},
+            "results": rows}
+
+
+def fresh_time(code:str, repeat:int=3)->tuple[float, list[str]]:
+    """
+    returns the best wall time [s] of running code in repeat fresh
+    interpreters (started in the folder of the app) and the LAZY_MODULES
+    loaded by it
+    """
+    times = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", STARTUP_CODE.format(code=code, lazy=LAZY_MODULES)],
+                             capture_output=True, text=True, check=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__)))
+        wall, loaded = out.stdout.split("\n")[-3:-1]
+        times.append(float(wall))
+    return min(times), [m for m in loaded.split(",") if m]
+
+
+def spawn_time(repeat:int=3)->float:
+    """
+    returns the best wall time [s] from creating a process pool as
+    get_executor does to the result of a first task in it: start of the
+    interpreter, import of this script and of sections_EC2_module
+    """
+    times = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=1, mp_context=sm.multiprocessing.get_context("spawn")) as pool:
+            pool.submit(sm.store_version).result()
+        times.append(time.perf_counter()-t)
+    return min(times)
+
+
+def run_startup(repeat:int=3)->dict:
+    """
+    returns the startup report: one row per stage of STARTUP_BUDGET with
+    its budget, the LAZY_MODULES it loaded and whether it is over budget.
+    "first section" is the import of sections_EC2_module and the first
+    section built, where the analysis libraries are loaded
+    """
+    measured = {f"import {name}": fresh_time(f"import {name}", repeat)
+                for name in ("sections_EC2_module", "sections_EC2_loads",
+                             "sections_EC2_plots", "sections_EC2_batch")}
+    measured["spawn worker"] = (spawn_time(repeat), [])
+    measured["first section"] = fresh_time(
+        "import sections_EC2_module as sm; "
+        "sm.cached_section(sm.section_spec('Circular', fck=30, fy=450, circ_diameter=1000, "
+        "circ_cover=60, circ_n_bars=12, circ_d_bars=25))",
+        repeat)
+    rows = []
+    for stage, (wall, loaded) in measured.items():
+        budget = STARTUP_BUDGET[stage]
+        over = wall > budget or (stage != "first section" and bool(loaded))
+        rows.append({"case": "startup",
+                     "stage": stage,
+                     "wall_s": round(wall, 6),
+                     "peak_mb": None,
+                     "load_cases": 0,
+                     "per_s": None,
+                     "budget_s": budget,
+                     "loaded": " ".join(loaded),
+                     "over_budget": over})
+        print(f"{stage:32s} {wall:9.4f} s", file=sys.stderr, flush=True)
+    return {"meta": {"suite": "startup",
+                     "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                     "python": platform.python_version(),
+                     "platform": platform.platform(),
+                     "machine": platform.machine(),
+                     "concreteproperties": sm._package_version("concreteproperties"),
+                     "sectionproperties": sm._package_version("sectionproperties"),
+                     "numpy": np.__version__,
+                     "store_version": sm.store_version()},
+            "results": rows}
+
+
+def compare(report:dict, baseline:dict, threshold:float=0.2, min_delta:float=0.005)->pd.DataFrame:
+    """
+    returns the stages of report matched with baseline, with the ratio of
+    the wall times and a flag for the ones slower than 1+threshold
+    (and by more than min_delta seconds, below that it is timer noise)
+    """
+    new = pd.DataFrame(report["results"])
+    old = pd.DataFrame(baseline["results"])
+    df = new.merge(old[["case", "stage", "wall_s", "peak_mb"]],
+                   on=["case", "stage"], how="left", suffixes=("", "_baseline"))
+    df["ratio"] = (df["wall_s"]/df["wall_s_baseline"]).round(3)
+    df["regression"] = ((df["ratio"] > 1+threshold)
+                        & (df["wall_s"]-df["wall_s_baseline"] > min_delta))
+    return df[["case", "stage", "wall_s_baseline", "wall_s", "ratio",
+               "peak_mb_baseline", "peak_mb", "regression"]]
+
+
+def main(argv:Optional[list[str]]=None)->int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--suite", choices=sorted(SUITES), default="quick")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="runs of each stage, the best time is kept")
+    parser.add_argument("--stage", action="append",
+                        help="run only this stage (can be repeated)")
+    parser.add_argument("--no-memory", action="store_true",
+                        help="skip the traced run that measures peak memory")
+    parser.add_argument("-o", "--output", help="write the report to this json file")
+    parser.add_argument("--save-baseline", metavar="PATH",
+                        help="store the report as baseline")
+    parser.add_argument("--compare", metavar="PATH",
+                        help="compare with a stored baseline")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="allowed slowdown with --compare (0.2 = 20%%)")
+    parser.add_argument("--startup", action="store_true",
+                        help="time the imports and a worker start against STARTUP_BUDGET")
+    args = parser.parse_args(argv)
+
+    if args.startup:
+        report = run_startup(repeat=args.repeat)
+    else:
+        report = run_suite(args.suite, repeat=args.repeat,
+                           memory=not args.no_memory, only=args.stage)
+    table = pd.DataFrame(report["results"])
+    print(table.to_string(index=False))
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w") as f:
+                json.dump(report, f, indent=1)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline["meta"].get("platform") != report["meta"]["platform"]:
+            print("warning: baseline recorded on "+str(baseline["meta"].get("platform")),
+                  file=sys.stderr)
+        df = compare(report, baseline, args.threshold)
+        print()
+        print(df.to_string(index=False))
+        slower = df[df["regression"]]
+        if len(slower):
+            print(f"\n{len(slower)} stages slower than the baseline by more than "
+                  f"{args.threshold:.0%}", file=sys.stderr)
+            return 1
+    if args.startup and table["over_budget"].any():
+        print(f"\n{table['over_budget'].sum()} startup stages over budget or loading "
+              f"the analysis libraries", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,266 @@
+"""
+Import of load combinations from large CSV or Parquet exports.
+
+    df, info = load_actions("member_12.parquet", kind="uls")
+
+Files are read in chunks (memory-mapped where possible), the columns are
+mapped on the action tables of the app (ULS_COLUMNS, SLS_COLUMNS) and
+converted to kN and kNm, and the cases are reduced chunk by chunk, so
+the whole file is never in memory:
+
+    - "hull": only the vertices of the convex hull of the (N, M) points
+      are kept, plus the cases with the largest and smallest V. The ULS
+      utilisation M/Mrd(N) has convex sublevel sets (the M-N domain is
+      convex), so its maximum over all the cases is at a hull vertex.
+      For a slender column the hull is taken on the design moments
+      (transform and moment of load_actions): the second order moment is
+      not linear in N, so the hull of the first order moments can miss
+      the governing case.
+    - "unique": cases with the same (N, M) (and V) are kept once.
+      Use it for SLS, where stresses and crack widths are not convex
+      in (N, M).
+    - None: every case is kept.
+"""
+import os
+import re
+from typing import Callable, Iterator, Optional
+import numpy as np
+import pandas as pd
+import sections_EC2_module as sm
+
+## names used for the columns by analysis programs (compared lowercase,
+## without the unit in brackets)
+
+COLUMN_ALIASES = {
+    "Load Case": ("load case", "loadcase", "lc", "case", "combination", "combo",
+                  "load combination", "name"),
+    "N [kN]": ("n", "p", "fx", "axial", "axial force", "normal force"),
+    "M [kNm]": ("m", "my", "m3", "moment", "bending moment"),
+    "V [kN]": ("v", "vz", "v2", "shear", "shear force"),
+}
+
+## factors to kN and kNm
+FORCE_UNITS = {"N": 1e-3, "kN": 1.0, "MN": 1e3}
+MOMENT_UNITS = {"Nmm": 1e-6, "Nm": 1e-3, "kNm": 1.0, "MNm": 1e3}
+
+CHUNK_ROWS = 100_000
+
+_UNIT = re.compile(r"[\[(]\s*([^\])]+?)\s*[\])]\s*$")
+
+
+def _split_header(name:str)->tuple[str, Optional[str]]:
+    """
+    returns the name of a column without its unit and the unit, e.g.
+    "Fx [kN]" -> ("fx", "kN")
+    """
+    match = _UNIT.search(str(name))
+    unit = match.group(1).replace(" ", "").replace("*", "").replace(".", "") if match else None
+    base = _UNIT.sub("", str(name)).strip().lower()
+    return base, unit
+
+
+def map_columns(header:list[str], columns:Optional[dict]=None)->dict[str, str]:
+    """
+    returns a dict app column -> file column; columns gives the file
+    column of some app columns explicitly, the others are looked up in
+    COLUMN_ALIASES
+    """
+    mapping = dict(columns or {})
+    for target, aliases in COLUMN_ALIASES.items():
+        if target in mapping:
+            continue
+        for name in header:
+            if name == target or _split_header(name)[0] in aliases:
+                mapping[target] = name
+                break
+    missing = [col for col in ("N [kN]", "M [kNm]") if col not in mapping]
+    if missing:
+        raise ValueError(f"columns {missing} not found in {list(header)}, "
+                         "give them with columns={...}")
+    return mapping
+
+
+def unit_factors(mapping:dict[str, str], units:Optional[dict]=None)->dict[str, float]:
+    """
+    returns the factor to kN/kNm of each mapped column: from units
+    ({"force": "N", "moment": "Nmm"}) if given, else from the unit in the
+    file header, else 1 (kN and kNm)
+    """
+    units = units or {}
+    factors = {}
+    for target, name in mapping.items():
+        if target == "Load Case":
+            continue
+        table, key = (MOMENT_UNITS, "moment") if target == "M [kNm]" else (FORCE_UNITS, "force")
+        unit = units.get(key) or _split_header(name)[1] or ("kNm" if key == "moment" else "kN")
+        if unit not in table:
+            raise ValueError(f"unknown {key} unit {unit!r} of column {name!r}, "
+                             f"use one of {list(table)}")
+        factors[target] = table[unit]
+    return factors
+
+
+def file_format(source, fmt:Optional[str]=None)->str:
+    """
+    returns "parquet" or "csv" from fmt or from the file name
+    """
+    if fmt:
+        return fmt.lower()
+    name = source if isinstance(source, (str, os.PathLike)) else getattr(source, "name", "")
+    return "parquet" if str(name).lower().endswith((".parquet", ".pq")) else "csv"
+
+
+def _raw_chunks(source, fmt:str, chunk_rows:int, sep:str)->Iterator[pd.DataFrame]:
+    """
+    yields the file in chunks of chunk_rows rows, with the file columns
+    """
+    if fmt == "parquet":
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as exc:
+            raise ImportError("reading Parquet files needs pyarrow") from exc
+        parquet = pq.ParquetFile(source, memory_map=isinstance(source, (str, os.PathLike)))
+        for batch in parquet.iter_batches(batch_size=chunk_rows):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(source, sep=sep, chunksize=chunk_rows,
+                               memory_map=isinstance(source, (str, os.PathLike)))
+
+
+def read_chunks(source,
+                kind:str="uls",
+                columns:Optional[dict]=None,
+                units:Optional[dict]=None,
+                tension_positive:bool=False,
+                fmt:Optional[str]=None,
+                chunk_rows:int=CHUNK_ROWS,
+                sep:str=",",
+                )->Iterator[pd.DataFrame]:
+    """
+    yields the actions of a CSV or Parquet file (path or file object) in
+    chunks with the columns of the app tables (ULS_COLUMNS for kind="uls",
+    SLS_COLUMNS for "sls"), in kN and kNm, compression positive (set
+    tension_positive if the file has tension positive).
+    Cases without a name are called "Row <row number in the file>"
+    """
+    target = sm.ULS_COLUMNS if kind == "uls" else sm.SLS_COLUMNS
+    mapping = factors = None
+    start = 0
+    for raw in _raw_chunks(source, file_format(source, fmt), chunk_rows, sep):
+        if mapping is None:
+            mapping = map_columns(list(raw.columns), columns)
+            factors = unit_factors(mapping, units)
+        chunk = pd.DataFrame(index=pd.RangeIndex(len(raw)))
+        for col in target:
+            if col == "Load Case":
+                chunk[col] = (raw[mapping[col]].astype(str).to_numpy() if col in mapping
+                              else [f"Row {start+i+1}" for i in range(len(raw))])
+            elif col in mapping:
+                chunk[col] = pd.to_numeric(raw[mapping[col]], errors="coerce").to_numpy()*factors[col]
+            else:
+                chunk[col] = 0.0
+        if tension_positive:
+            chunk["N [kN]"] = -chunk["N [kN]"]
+        start += len(raw)
+        yield chunk.dropna(subset=["N [kN]", "M [kNm]"])
+
+
+def hull_cases(df:pd.DataFrame, moment:str="M [kNm]")->pd.DataFrame:
+    """
+    returns the cases of df that are vertices of the convex hull of the
+    (N, moment) points, plus the cases with the largest and smallest V
+    """
+    from scipy.spatial import ConvexHull, QhullError
+    if len(df) <= 3:
+        return df
+    nm = df[["N [kN]", moment]].to_numpy(dtype=float)
+    # scaled so that kN and kNm weigh the same in the tolerance of qhull
+    span = np.ptp(nm, axis=0)
+    span[span == 0] = 1
+    try:
+        keep = set(ConvexHull(nm/span).vertices)
+    except QhullError:
+        # all the points on a line (or one point): its end points
+        keep = {nm[:, 0].argmin(), nm[:, 0].argmax(), nm[:, 1].argmin(), nm[:, 1].argmax()}
+    if "V [kN]" in df:
+        v = df["V [kN]"].to_numpy(dtype=float)
+        keep |= {v.argmin(), v.argmax()}
+    return df.iloc[sorted(keep)]
+
+
+def reduce_cases(df:pd.DataFrame,
+                 reduce:Optional[str]="hull",
+                 moment:str="M [kNm]",
+                 )->pd.DataFrame:
+    """
+    returns the governing cases of df: "hull" (hull_cases on the moment
+    column), "unique" (same actions kept once) or None (all)
+    """
+    if reduce == "hull":
+        return hull_cases(df, moment)
+    if reduce == "unique":
+        return df.drop_duplicates(subset=[col for col in df.columns if col != "Load Case"])
+    if reduce is None:
+        return df
+    raise ValueError(f"unknown reduction {reduce!r}, use 'hull', 'unique' or None")
+
+
+def unique_cases(df:pd.DataFrame)->pd.DataFrame:
+    """
+    returns df with the repeated load case names numbered ("LC1",
+    "LC1 (2)", ...), so that "Load Case" can index the table, e.g. when
+    imported cases are appended to the cases of the app
+    """
+    names = df["Load Case"].astype(str)
+    count = names.groupby(names).cumcount()
+    while (count > 0).any():
+        names = names.where(count == 0, names + " (" + (count+1).astype(str) + ")")
+        count = names.groupby(names).cumcount()
+    return df.assign(**{"Load Case": names.to_numpy()})
+
+
+def load_actions(source,
+                 kind:str="uls",
+                 reduce:Optional[str]="default",
+                 columns:Optional[dict]=None,
+                 units:Optional[dict]=None,
+                 tension_positive:bool=False,
+                 fmt:Optional[str]=None,
+                 chunk_rows:int=CHUNK_ROWS,
+                 sep:str=",",
+                 transform:Optional[Callable[[pd.DataFrame], pd.DataFrame]]=None,
+                 moment:str="M [kNm]",
+                 )->tuple[pd.DataFrame, dict]:
+    """
+    returns the reduced action table of a CSV or Parquet file (columns of
+    the app tables) and a dict with the number of cases read and kept.
+    Each chunk is reduced together with the cases kept so far, so memory
+    is bounded by the chunk size and the reduced set.
+    reduce is "hull", "unique" or None; by default "hull" for ULS and
+    "unique" for SLS. transform, if given, adds columns to each chunk
+    before it is reduced, and the hull is taken on its moment column, e.g.
+    the design moments of a slender column:
+
+        load_actions(path, transform=partial(sm.slender_actions, spec, length=7000),
+                     moment="MEd [kNm]")
+
+    The returned table only has the columns of the file.
+    See read_chunks for the other arguments
+    """
+    if reduce == "default":
+        reduce = "hull" if kind == "uls" else "unique"
+    columns_out = sm.ULS_COLUMNS if kind == "uls" else sm.SLS_COLUMNS
+    kept = pd.DataFrame(columns=columns_out)
+    read = 0
+    with sm.stage("loads.import"):
+        for chunk in read_chunks(source, kind=kind, columns=columns, units=units,
+                                 tension_positive=tension_positive, fmt=fmt,
+                                 chunk_rows=chunk_rows, sep=sep):
+            read += len(chunk)
+            columns_out = list(chunk.columns)
+            if transform is not None:
+                chunk = transform(chunk)
+            kept = reduce_cases(pd.concat([kept, chunk], ignore_index=True) if len(kept) else chunk,
+                                reduce, moment)
+    kept = kept[columns_out].reset_index(drop=True)
+    return kept, {"read": read, "kept": len(kept), "reduce": reduce}
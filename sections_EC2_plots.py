@@ -0,0 +1,157 @@
+"""
+Plotly figures of the app, built directly from the result arrays.
+Forces are shown in kN and moments in kNm, as the action tables.
+"""
+from __future__ import annotations
+from typing import TYPE_CHECKING
+import numpy as np
+import plotly.graph_objects as go
+
+## result types only for the annotations, concreteproperties is loaded
+## by the analyses (see sections_EC2_module)
+if TYPE_CHECKING:
+    from concreteproperties.concrete_section import ConcreteSection
+    from concreteproperties.results import MomentInteractionResults, MomentCurvatureResults, StressResult
+
+## maximum number of points of a curve, about the width of a plot in pixels
+MAX_POINTS = 500
+
+COLOURS = ["#1f77b4", "#d62728", "#2ca02c", "#9467bd", "#ff7f0e", "#8c564b"]
+
+
+def decimate(x:np.ndarray, y:np.ndarray, max_points:int=MAX_POINTS)->tuple[np.ndarray, np.ndarray]:
+    """
+    returns the curve (x, y) reduced to max_points with the
+    largest-triangle-three-buckets method: first and last points are kept
+    and from each bucket the point that makes the largest triangle with
+    the previous kept point and the mean of the next bucket, so peaks
+    and kinks survive
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if len(x) <= max_points or max_points < 3:
+        return x, y
+    edges = np.linspace(1, len(x)-1, max_points-1).astype(int)
+    keep = [0]
+    for b in range(len(edges)-1):
+        lo, hi = edges[b], edges[b+1]
+        nxt = slice(hi, edges[b+2]) if b+2 < len(edges) else slice(len(x)-1, len(x))
+        x_n, y_n = x[nxt].mean(), y[nxt].mean()
+        x_a, y_a = x[keep[-1]], y[keep[-1]]
+        area = np.abs((x_a-x_n)*(y[lo:hi]-y_a)-(x_a-x[lo:hi])*(y_n-y_a))
+        keep.append(lo+int(area.argmax()))
+    keep.append(len(x)-1)
+    return x[keep], y[keep]
+
+
+def _polygon_xy(polygons)->tuple[list, list]:
+    """
+    returns the coordinates of the rings of shapely polygons in one list,
+    separated by None, ready for a single filled trace
+    """
+    xs, ys = [], []
+    for poly in polygons:
+        for ring in [poly.exterior, *poly.interiors]:
+            x, y = ring.xy
+            xs += list(x)+[None]
+            ys += list(y)+[None]
+    return xs, ys
+
+
+def _equal_axes(fig:go.Figure, x_title:str="x [mm]", y_title:str="y [mm]")->go.Figure:
+    fig.update_xaxes(title=x_title)
+    fig.update_yaxes(title=y_title, scaleanchor="x", scaleratio=1)
+    fig.update_layout(margin=dict(l=10, r=10, t=30, b=10), plot_bgcolor="white")
+    return fig
+
+
+def section_figure(conc_section:ConcreteSection)->go.Figure:
+    """
+    returns the figure of the section: concrete and bars as one filled
+    trace each
+    """
+    fig = go.Figure()
+    x, y = _polygon_xy([geom.geom for geom in conc_section.concrete_geometries])
+    fig.add_trace(go.Scatter(x=x, y=y, fill="toself", mode="lines",
+                             line=dict(color="black", width=1),
+                             fillcolor="lightgrey", name="Concrete",
+                             hoverinfo="skip"))
+    x, y = _polygon_xy([geom.geom for geom in conc_section.reinf_geometries_lumped])
+    fig.add_trace(go.Scatter(x=x, y=y, fill="toself", mode="lines",
+                             line=dict(color="black", width=1),
+                             fillcolor="black", name="Bars",
+                             hoverinfo="skip"))
+    return _equal_axes(fig)
+
+
+def interaction_figure(mi_results:list[MomentInteractionResults],
+                       labels:list[str],
+                       n_actions:list=(),
+                       m_actions:list=(),
+                       lc_actions:list=(),
+                       )->go.Figure:
+    """
+    returns the figure of the M-N diagrams (moment about x, compression
+    positive) with the load cases as points
+    """
+    fig = go.Figure()
+    for i, (mi, label) in enumerate(zip(mi_results, labels)):
+        n, m = mi.get_results_lists(moment="m_x")
+        m, n = decimate(np.asarray(m)/1e6, np.asarray(n)/1e3)
+        fig.add_trace(go.Scatter(x=m, y=n, mode="lines", name=label,
+                                 line=dict(color=COLOURS[i % len(COLOURS)])))
+    if len(n_actions):
+        fig.add_trace(go.Scatter(x=list(m_actions), y=list(n_actions),
+                                 mode="markers+text", name="Load cases",
+                                 text=list(lc_actions), textposition="top center",
+                                 marker=dict(color="black", size=8)))
+    fig.update_xaxes(title="M [kNm]", zeroline=True, zerolinecolor="grey")
+    fig.update_yaxes(title="N [kN]", zeroline=True, zerolinecolor="grey")
+    fig.update_layout(margin=dict(l=10, r=10, t=30, b=10), plot_bgcolor="white")
+    return fig
+
+
+def stress_figure(stress_res:StressResult, max_points:int=4000)->go.Figure:
+    """
+    returns the figure of the stresses [MPa] of a stress result: concrete
+    mesh nodes (at most max_points) and bars coloured by stress
+    """
+    fig = go.Figure()
+    x, y = _polygon_xy([sec.geometry.geom for sec in stress_res.concrete_analysis_sections])
+    fig.add_trace(go.Scatter(x=x, y=y, mode="lines", name="Concrete",
+                             line=dict(color="grey", width=1), hoverinfo="skip"))
+    if stress_res.concrete_analysis_sections:
+        nodes = np.vstack([sec.mesh_nodes for sec in stress_res.concrete_analysis_sections])
+        sig = np.concatenate([np.asarray(s, dtype=float) for s in stress_res.concrete_stresses])
+        step = max(len(sig)//max_points, 1)
+        fig.add_trace(go.Scatter(x=nodes[::step, 0], y=nodes[::step, 1], mode="markers",
+                                 name="Concrete stress",
+                                 marker=dict(color=sig[::step], colorscale="Blues",
+                                             size=4, showscale=True,
+                                             colorbar=dict(title="Concrete [MPa]", x=1.0)),
+                                 hovertemplate="%{marker.color:.1f} MPa<extra></extra>"))
+    xy = np.array([geom.calculate_centroid() for geom in stress_res.lumped_reinforcement_geometries]).reshape(-1, 2)
+    sig_s = np.asarray(stress_res.lumped_reinforcement_stresses, dtype=float)
+    fig.add_trace(go.Scatter(x=xy[:, 0], y=xy[:, 1], mode="markers", name="Bar stress",
+                             marker=dict(color=sig_s, colorscale="RdBu", cmid=0,
+                                         size=10, line=dict(color="black", width=1),
+                                         showscale=True,
+                                         colorbar=dict(title="Bars [MPa]", x=1.15)),
+                             hovertemplate="%{marker.color:.1f} MPa<extra></extra>"))
+    fig.update_layout(showlegend=False)
+    return _equal_axes(fig)
+
+
+def curvature_figure(mc_results:list[MomentCurvatureResults], labels:list[str])->go.Figure:
+    """
+    returns the figure of the moment-curvature diagrams
+    """
+    fig = go.Figure()
+    for i, (mc, label) in enumerate(zip(mc_results, labels)):
+        kappa, m = decimate(mc.kappa, np.asarray(mc.m_xy)/1e6)
+        fig.add_trace(go.Scatter(x=kappa, y=m, mode="lines", name=label,
+                                 line=dict(color=COLOURS[i % len(COLOURS)])))
+    fig.update_xaxes(title="Curvature [1/mm]", exponentformat="e")
+    fig.update_yaxes(title="M [kNm]")
+    fig.update_layout(margin=dict(l=10, r=10, t=30, b=10), plot_bgcolor="white")
+    return fig
@@ -2,46 +2,265 @@ import numpy as np
 import pandas as pd
 from dataclasses import dataclass
 
+
+def h_c_eff(h:np.ndarray, d:np.ndarray, x:np.ndarray)->np.ndarray:
+    """
+    returns the depth of the effective tension area around the bars
+    according to EC2 7.3.2(3), for arrays of sections/load cases
+
+    Assumptions:
+        - h is the depth of the section
+        - d is the effective depth (to the extreme tension bars)
+        - x is the neutral axis depth (0 if the whole section is in tension)
+    """
+    h, d, x = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (h, d, x)))
+    return np.minimum.reduce([2.5*(h-d), (h-x)/3, h/2])
+
+
+def crack_width_EC2(sigma_s:np.ndarray,
+                    rho_eff:np.ndarray,
+                    phi:np.ndarray,
+                    c:np.ndarray,
+                    fct_eff:np.ndarray,
+                    Ecm:np.ndarray,
+                    Es:float=200e3,
+                    kt:float=0.4,
+                    k1:float=0.8,
+                    k2:np.ndarray=0.5,
+                    k3:float=3.4,
+                    k4:float=0.425,
+                    )->np.ndarray:
+    """
+    returns the crack width w_k according to EC2 7.3.4, eq. (7.8), (7.9)
+    and (7.11); all the inputs are broadcast, so whole arrays of load
+    cases are computed at once
+
+    Assumptions:
+        - All values are in N and mm (stresses in MPa)
+        - sigma_s is the tensile stress in the most tensioned bar (>= 0)
+        - rho_eff is As/Ac,eff
+        - phi is the (equivalent) bar diameter, c the cover to the bars
+        - kt is 0.6 for short term and 0.4 for long term loading
+        - k2 is 0.5 for bending and 1.0 for pure tension
+        - the bar spacing is not larger than 5(c+phi/2), so that (7.11)
+          applies
+    """
+    sigma_s = np.maximum(np.asarray(sigma_s, dtype=float), 0)
+    rho_eff = np.asarray(rho_eff, dtype=float)
+    alpha_e = Es/np.asarray(Ecm, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        eps_diff = (sigma_s-kt*fct_eff/rho_eff*(1+alpha_e*rho_eff))/Es
+        eps_diff = np.maximum(eps_diff, 0.6*sigma_s/Es)
+        s_r_max = k3*c+k1*k2*k4*phi/rho_eff
+        w_k = s_r_max*eps_diff
+    return np.where((sigma_s > 0) & (rho_eff > 0), w_k, 0.0)
+
+
+def limit_slenderness_EC2(n:np.ndarray,
+                          phi_ef:np.ndarray=None,
+                          omega:np.ndarray=None,
+                          r_m:np.ndarray=None,
+                          )->np.ndarray:
+    """
+    returns the limit slenderness lambda_lim = 20*A*B*C/sqrt(n) of
+    EC2 5.8.3.1 (5.13N), for arrays of columns/load cases
+
+    Assumptions:
+        - n = N_Ed/(A_c*f_cd) is the relative axial force, compression
+          positive; members in tension (n <= 0) have no limit (inf)
+        - phi_ef is the effective creep ratio, omega = A_s*f_yd/(A_c*f_cd)
+          the mechanical reinforcement ratio, r_m = M01/M02 the ratio of
+          the end moments; None gives the values of EC2 for unknown ones
+          (A=0.7, B=1.1, C=0.7)
+    """
+    n = np.asarray(n, dtype=float)
+    a = 0.7 if phi_ef is None else 1/(1+0.2*np.asarray(phi_ef, dtype=float))
+    b = 1.1 if omega is None else np.sqrt(1+2*np.asarray(omega, dtype=float))
+    c = 0.7 if r_m is None else 1.7-np.asarray(r_m, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        lam = 20*a*b*c/np.sqrt(n)
+    return np.where(n > 0, lam, np.inf)
+
+
+def nominal_curvature_EC2(n:np.ndarray,
+                          omega:np.ndarray,
+                          d:np.ndarray,
+                          fyd:np.ndarray,
+                          lam:np.ndarray,
+                          fck:np.ndarray,
+                          phi_ef:np.ndarray=0.0,
+                          Es:float=200e3,
+                          n_bal:float=0.4,
+                          )->np.ndarray:
+    """
+    returns the curvature 1/r = K_r*K_phi*eps_yd/(0.45*d) of the nominal
+    curvature method, EC2 5.8.8.3 (5.34)-(5.37), for arrays of
+    columns/load cases
+
+    Assumptions:
+        - All values are in N and mm (stresses in MPa)
+        - n and omega as in limit_slenderness_EC2
+        - d is the effective depth (h/2+i_s if the bars are not all on
+          the two faces, i_s radius of gyration of the bars)
+        - lam is the slenderness of the column
+    """
+    n = np.asarray(n, dtype=float)
+    n_u = 1+np.asarray(omega, dtype=float)
+    k_r = np.clip((n_u-n)/(n_u-n_bal), 0, 1)
+    beta = 0.35+np.asarray(fck, dtype=float)/200-np.asarray(lam, dtype=float)/150
+    k_phi = np.maximum(1+beta*phi_ef, 1)
+    return k_r*k_phi*(fyd/Es)/(0.45*np.asarray(d, dtype=float))
+
+
 @dataclass
 class Column_EC2:
     """
-    A data type to describe the data required to compute the capacity of a  concrete 
-    column.
-    
-    Assumptions: 
-        - All values are in SI units
-        - h is the clear height of the column
-        - E is the elastic modulus
-        - A is the cross sectional area
-        - Ix is the Second moment of area about the x-axis (strong axis)
-        - Iy is the Second moment of area about the y-axis (weak axis)
-        - kx is the effective length factor about the x-axis
-        - ky is the effective length factor about the y-axis
+    A data type to describe the data required to compute the capacity of
+    concrete columns. Every field can be an array with one value per
+    column (a struct of arrays), so that whole buildings are checked at
+    once; take() selects the columns of each column/combination pair.
+
+    Assumptions:
+        - All values are in N and mm (stresses in MPa)
+        - h is the depth of the section in the plane of bending
+        - E is the elastic modulus of the concrete
+        - A is the cross sectional area and I its second moment of area
+          about the bending axis
+        - c is the cover, d the effective depth
+        - sigma_s is the tensile stress in the most tensioned bar (set by
+          crack_width_rect)
+        - length is the clear height of the column and k the effective
+          length factor (l0 = k*length)
+        - As is the area of all the bars
+        - fck, fy are the characteristic strengths, gamma_c, gamma_s the
+          material factors
+        - phi_ef is the effective creep ratio
     """
 
     h: float
     E: float
     A: float
     c: float
-    d:float
-    sigma_s:float
+    d: float
+    sigma_s: float = 0.0
+    length: float = 0.0
+    k: float = 1.0
+    I: float = 0.0
+    As: float = 0.0
+    fck: float = 30.0
+    fy: float = 450.0
+    gamma_c: float = 1.50
+    gamma_s: float = 1.15
+    phi_ef: float = 0.0
+
+    def take(self, index:np.ndarray)->"Column_EC2":
+        """
+        returns the columns at index (e.g. the column of each
+        column/combination pair) as a new struct of arrays
+        """
+        return Column_EC2(**{name: np.asarray(value)[index] if np.ndim(value) else value
+                             for name, value in self.__dict__.items()})
+
+    def slenderness(self)->np.ndarray:
+        """
+        returns the slenderness lambda = l0/i of EC2 5.8.3.2
+        """
+        return self.k*np.asarray(self.length, dtype=float)/np.sqrt(np.asarray(self.I)/self.A)
+
+    def second_order(self,
+                     n_ed:np.ndarray,
+                     m02:np.ndarray,
+                     r_m:np.ndarray=None,
+                     c0:float=10,
+                     )->dict[str, np.ndarray]:
+        """
+        returns a dict of arrays with the slenderness ("lambda"), the limit
+        slenderness ("lambda_lim"), the mask of the slender columns
+        ("slender"), the imperfection eccentricity ("e_i"), the second
+        order moment ("M2") and the design moment ("M_Ed") of the nominal
+        curvature method, EC2 5.8.8, for the axial forces n_ed and the
+        larger end moments m02 (broadcast with the fields of the columns).
+
+        Assumptions:
+            - n_ed is positive in compression, m02 has the sign of the
+              design moment (which keeps it)
+            - r_m = M01/M02 (-1 to 1); None for unknown, taken as equal
+              end moments (r_m = 1, C = 0.7)
+            - the imperfection is e_i = l0/400 (5.2(7)) and the moment is
+              at least N_Ed*e_0, e_0 = max(h/30, 20 mm) (6.1(4))
+            - the equivalent first order moment is
+              M0e = max(0.6*M02+0.4*M01, 0.4*M02) (5.32) and
+              M_Ed = max(M0e+M2, M02, M01+M2/2) (5.8.8.2(3))
+            - c0 = 10 (about pi^2) for a constant cross section
+        """
+        n_ed = np.asarray(n_ed, dtype=float)
+        m02 = np.asarray(m02, dtype=float)
+        ratio = 1.0 if r_m is None else np.clip(np.asarray(r_m, dtype=float), -1, 1)
+        fcd = np.asarray(self.fck, dtype=float)/self.gamma_c
+        fyd = np.asarray(self.fy, dtype=float)/self.gamma_s
+        n_c = np.maximum(n_ed, 0)
+        n = n_ed/(self.A*fcd)
+        omega = self.As*fyd/(self.A*fcd)
+
+        l0 = self.k*np.asarray(self.length, dtype=float)
+        lam = self.slenderness()
+        lam_lim = limit_slenderness_EC2(n, phi_ef=self.phi_ef, omega=omega, r_m=r_m)
+        slender = lam > lam_lim
+        curvature = nominal_curvature_EC2(n, omega, self.d, fyd, lam, self.fck, phi_ef=self.phi_ef)
+        m2 = np.where(slender, n_c*curvature*l0**2/c0, 0.0)
+
+        e_i = l0/400
+        m_02 = np.abs(m02)+n_c*e_i
+        m_01 = ratio*np.abs(m02)+n_c*e_i
+        m0e = np.maximum(0.6*m_02+0.4*m_01, 0.4*m_02)
+        e_0 = np.maximum(np.asarray(self.h, dtype=float)/30, 20)
+        m_ed = np.maximum.reduce(np.broadcast_arrays(m0e+m2, m_02, m_01+m2/2, n_c*e_0))
+        sign = np.where(m02 < 0, -1.0, 1.0)
+        return {"lambda": np.broadcast_to(lam, m_ed.shape),
+                "lambda_lim": np.broadcast_to(lam_lim, m_ed.shape),
+                "slender": np.broadcast_to(slender, m_ed.shape),
+                "e_i": np.broadcast_to(e_i, m_ed.shape),
+                "M2": np.broadcast_to(m2, m_ed.shape),
+                "M_Ed": sign*m_ed}
 
     def crack_width_rect(self,
-                    cracked_df:pd.DataFrame, 
-                    rect_df:pd.DataFrame,
-                    kc:float, 
-                    b_eff:float, 
+                    cracked_df:pd.DataFrame,
+                    b_eff:float,
+                    x:float,
+                    fct_eff:float,
+                    Ecm:float,
+                    kt:float=0.4,
                     )-> float:
         """
     returns the crack width of a sections
-    
-    Assumptions: 
-        - All values are in SI units
-        - x_nn is the neutral axis depth
+
+    Assumptions:
+        - All values are in N and mm
+        - h is the section depth, d the effective depth, c the cover
+        - cracked_df is the stress table of get_stress_df
+        - x is the neutral axis depth
+        - b_eff is the width of the effective tension area
         - sigma_s is the maximum tensile stress in the bars
     """
-        
-        h_eff= min(2.5*(self.h-self.d),(self.h-self.x)/3, self.h/2)
-        
-        sigma_s = abs(cracked_df["Stress [MPa]"].min())
-        delta_espsilon = sigma_s
\ No newline at end of file
+
+        h_eff = h_c_eff(self.h, self.d, x)
+
+        stress = cracked_df["Stress [MPa]"].to_numpy()
+        area = cracked_df["Area [mm2]"].to_numpy()
+        y = cracked_df["y location [mm]"].to_numpy()
+        # depth from the compressed face (tension on the lower side if the
+        # most tensioned bar is below the centroid)
+        depth = self.h/2-y if y[stress.argmin()] < 0 else self.h/2+y
+        in_eff = (stress < 0) & (depth >= self.h-h_eff)
+        self.sigma_s = max(-stress.min(), 0)
+
+        phi = np.sqrt(4*area[in_eff]/np.pi)
+        phi_eq = (phi**2).sum()/phi.sum() if in_eff.any() else 0
+        rho_eff = area[in_eff].sum()/(b_eff*h_eff)
+        return float(crack_width_EC2(sigma_s=self.sigma_s,
+                                     rho_eff=rho_eff,
+                                     phi=phi_eq,
+                                     c=self.c,
+                                     fct_eff=fct_eff,
+                                     Ecm=Ecm,
+                                     kt=kt))
@@ -0,0 +1,51 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+
+## the modules of the app are at the top of the repository
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sections_EC2_module as sm
+
+RECT_BARS = pd.DataFrame({"Bars diameter [mm]": [20, 20, 16],
+                          "Number of bars": [3, 3, 1],
+                          "Cover [mm]": [40, 40, 40]},
+                         index=["Top layer 1", "Bottom layer 1", "Side layer 1"])
+
+
+def rect_spec(**kwargs):
+    """
+    returns the spec of a 400x500 C30 section with the same top and bottom
+    layer, changed by kwargs (arguments of section_spec)
+    """
+    args = dict(fck=30, fy=450, height=500, width=400, rect_df=RECT_BARS)
+    return sm.section_spec("Rectangular", **{**args, **kwargs})
+
+
+@pytest.fixture(scope="session")
+def spec():
+    return rect_spec()
+
+
+@pytest.fixture(scope="session")
+def section(spec):
+    return sm.cached_section(spec)
+
+
+@pytest.fixture(scope="session")
+def uls_cases(section):
+    """
+    actions at fixed fractions of the exact capacity, both directions:
+    (N [kN], M [kNm], fraction)
+    """
+    n, m, factor = [], [], []
+    for n_i in (-500.0, 0.0, 800.0, 2000.0):
+        for sign, theta in ((1, 0.0), (-1, np.pi)):
+            mrd = section.ultimate_bending_capacity(theta=theta, n=n_i*1e3).m_xy/1e6
+            for f in (0.5, 0.97, 1.03, 1.5):
+                n.append(n_i)
+                m.append(sign*f*mrd)
+                factor.append(f)
+    return np.array(n), np.array(m), np.array(factor)
@@ -0,0 +1,15 @@
+"""
+batch_uls_check against the exact capacity of each case
+"""
+import numpy as np
+import pytest
+import sections_EC2_module as sm
+
+
+def test_batch_uls_check_matches_exact_capacity(section, uls_cases):
+    n, m, factor = uls_cases
+    mrd, util = sm.batch_uls_check(section, n, m)
+    exact = np.abs(m)/factor
+    assert np.all(mrd <= exact*(1+1e-6))
+    assert mrd == pytest.approx(exact, rel=0.01)
+    assert np.array_equal(util <= 1, factor <= 1)
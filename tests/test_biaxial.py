@@ -0,0 +1,23 @@
+"""
+biaxial_check against the exact biaxial capacity of the section
+"""
+import numpy as np
+import pytest
+import sections_EC2_module as sm
+
+
+def test_biaxial_surface_is_conservative(spec, section):
+    surface = sm.biaxial_capacity_surface(spec)
+    n, mx, my = [], [], []
+    # neutral axis angles between those of the sweep
+    for theta in (0.3, 1.1, 2.0, -2.5):
+        for n_i in (-400e3, 500e3, 1500e3, 3000e3):
+            res = section.ultimate_bending_capacity(theta=theta, n=n_i)
+            n.append(n_i/1e3)
+            mx.append(res.m_x/1e6)
+            my.append(res.m_y/1e6)
+    mrd, util = sm.biaxial_check(surface, n, mx, my)
+    # exact capacity points: on or outside the stored surface, and close to it
+    assert (util >= 1-1e-6).all()
+    assert util == pytest.approx(1, abs=0.03)
+    assert mrd == pytest.approx(np.hypot(mx, my), rel=0.03)
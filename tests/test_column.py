@@ -0,0 +1,71 @@
+"""
+EC2 formulas of sections_EC2_resistance against hand-worked examples, and
+the reduction of the load cases of a slender column
+"""
+from functools import partial
+import numpy as np
+import pandas as pd
+import pytest
+import sections_EC2_loads as sl
+import sections_EC2_module as sm
+from sections_EC2_resistance import crack_width_EC2, nominal_curvature_EC2
+
+
+def test_crack_width_hand_example():
+    # sigma_s=250 MPa, rho_eff=2%, phi 16, c=40, fct,eff=2.9, Ecm=33 GPa, kt=0.4
+    # alpha_e = 200/33 = 6.061
+    # eps_sm-eps_cm = (250-0.4*2.9/0.02*(1+6.061*0.02))/200e3 = 9.248e-4 (> 0.6*250/200e3)
+    # s_r,max = 3.4*40+0.8*0.5*0.425*16/0.02 = 136+136 = 272 mm
+    # w_k = 272*9.248e-4 = 0.2516 mm
+    w_k = crack_width_EC2(sigma_s=250, rho_eff=0.02, phi=16, c=40, fct_eff=2.9, Ecm=33e3)
+    assert float(w_k) == pytest.approx(0.2516, abs=1e-4)
+
+
+def test_crack_width_minimum_strain_and_no_tension():
+    # low stress: eps_sm-eps_cm = 0.6*sigma_s/Es governs
+    # w_k = 272*0.6*100/200e3 = 0.0816 mm; compressed bars give no crack
+    w_k = crack_width_EC2(sigma_s=np.array([100, -50]), rho_eff=0.02, phi=16, c=40,
+                          fct_eff=2.9, Ecm=33e3)
+    assert w_k == pytest.approx([0.0816, 0.0], abs=1e-4)
+
+
+def test_nominal_curvature_hand_example():
+    # n=0.5, omega=0.3: K_r = (1.3-0.5)/(1.3-0.4) = 0.889
+    # beta = 0.35+30/200-60/150 = 0.10, phi_ef=1: K_phi = 1.10
+    # eps_yd = 391.3/200e3 = 1.957e-3, d=450: 1/r0 = 1.957e-3/(0.45*450) = 9.66e-6
+    # 1/r = 0.889*1.10*9.66e-6 = 9.447e-6 1/mm
+    curvature = nominal_curvature_EC2(n=0.5, omega=0.3, d=450, fyd=391.3, lam=60, fck=30, phi_ef=1)
+    assert float(curvature) == pytest.approx(9.447e-6, rel=1e-3)
+
+
+def test_nominal_curvature_limits():
+    # K_r is 1 below the balance load and K_phi is at least 1
+    curvature = nominal_curvature_EC2(n=np.array([0.2, 1.3]), omega=0.3, d=450, fyd=391.3,
+                                      lam=120, fck=30, phi_ef=2)
+    assert curvature == pytest.approx([391.3/200e3/(0.45*450), 0.0])
+
+
+def test_slender_column_reduction_keeps_governing_case(spec, section, tmp_path):
+    # 7 m column, phi_ef=1.5: MEd is concave in N once K_r < 1, so the
+    # middle of the segment (200, 200)-(400, 200) governs and is not a
+    # vertex of the (N, M) hull
+    n = np.linspace(200, 400, 21)
+    uls_df = pd.DataFrame({"Load Case": [f"LC{i}" for i in range(len(n))],
+                           "N [kN]": n, "M [kNm]": 200.0, "V [kN]": 0.0})
+    path = tmp_path / "column.csv"
+    uls_df.to_csv(path, index=False)
+    second_order = partial(sm.slender_actions, spec, length=7000, phi_ef=1.5)
+
+    def governing(df):
+        med = second_order(df)["MEd [kNm]"].to_numpy()
+        check, info = sm.governing_uls_check(section, df["N [kN]"].to_numpy(dtype=float), med,
+                                             load_cases=list(df["Load Case"]))
+        return info["governing"], info["utilisation"]
+
+    full_case, full_util = governing(uls_df)
+    assert full_case not in ("LC0", f"LC{len(n) - 1}")
+    reduced, info = sl.load_actions(path, transform=second_order, moment="MEd [kNm]")
+    assert info["kept"] < info["read"]
+    assert list(reduced.columns) == sm.ULS_COLUMNS
+    case, util = governing(reduced)
+    assert case == full_case and util == pytest.approx(full_util)
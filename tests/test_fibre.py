@@ -0,0 +1,16 @@
+"""
+fibre_moment_curvature against moment_curvature_analysis
+"""
+import numpy as np
+import pytest
+import sections_EC2_module as sm
+
+
+def test_fibre_moment_curvature_matches_meshed(section):
+    fibre = sm.fibre_moment_curvature(section, theta=0, n=2e5)
+    meshed = section.moment_curvature_analysis(theta=0, n=2e5, progress_bar=False)
+    kappa = np.linspace(0, min(max(fibre.kappa), max(meshed.kappa)), 50)
+    m_fibre = np.interp(kappa, fibre.kappa, fibre.m_xy)
+    m_meshed = np.interp(kappa, meshed.kappa, meshed.m_xy)
+    assert np.abs(m_fibre-m_meshed).max() <= 0.01*max(meshed.m_xy)
+    assert max(fibre.kappa) == pytest.approx(max(meshed.kappa), rel=0.1)
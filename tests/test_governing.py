@@ -0,0 +1,21 @@
+"""
+governing_uls_check against the exact capacity of each case
+"""
+import numpy as np
+import pytest
+import sections_EC2_module as sm
+
+
+def test_governing_uls_check_matches_exact_capacity(section, uls_cases):
+    n, m, factor = uls_cases
+    df, info = sm.governing_uls_check(section, n, m)
+    assert np.array_equal(df["Utilization Level"].to_numpy() <= 1, factor <= 1)
+    governing = df["Utilization Level"].to_numpy().argmax()
+    assert factor[governing] == factor.max()
+    assert info["utilisation"] == pytest.approx(factor.max(), rel=0.01)
+
+
+def test_governing_uls_check_without_actions(section):
+    df, info = sm.governing_uls_check(section, np.array([]), np.array([]))
+    assert list(df.columns) == sm.ULS_CHECK_COLUMNS
+    assert len(df) == 0 and info["governing"] is None
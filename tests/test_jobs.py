@@ -0,0 +1,99 @@
+"""
+JobQueue: shared jobs run once, in priority order, and are cancelled when
+no session wants them
+"""
+import threading
+import time
+import pytest
+import sections_EC2_module as sm
+
+
+def wait_until(condition, timeout=10.0):
+    end = time.perf_counter()+timeout
+    while not condition():
+        assert time.perf_counter() < end, "timed out"
+        time.sleep(0.01)
+
+
+def blocking(release, log=None, name=None):
+    """
+    returns a job function that waits for release (checking cancellation)
+    """
+    def fn():
+        if log is not None:
+            log.append(name)
+        while not release.wait(0.01):
+            sm.check_cancelled()
+        return name
+    return fn
+
+
+@pytest.fixture
+def release():
+    event = threading.Event()
+    yield event
+    event.set()
+
+
+def test_same_key_runs_once_for_all_sessions(release):
+    queue = sm.JobQueue(workers=2)
+    calls = []
+    job_a = queue.submit(("s1", "uls"), blocking(release, calls, "uls"), owner=("a", "uls"))
+    job_b = queue.submit(("s1", "uls"), blocking(release, calls, "uls"), owner=("b", "uls"))
+    assert job_a is job_b
+    release.set()
+    assert job_a.future.result(timeout=10) == "uls"
+    assert calls == ["uls"] and queue.stats()["shared"] == 1
+
+
+def test_new_inputs_cancel_the_previous_job(release):
+    queue = sm.JobQueue(workers=2)
+    running = queue.submit(("s1", "curvature"), blocking(release), owner=("a", "curvature"))
+    wait_until(lambda: running.state == "running")
+    shared = queue.submit(("s1", "sls"), blocking(release), owner=("a", "sls"))
+    queue.submit(("s1", "sls"), blocking(release), owner=("b", "sls"))
+    # a running job stops at its next check, a job another session wants goes on
+    queue.submit(("s2", "curvature"), blocking(release), owner=("a", "curvature"))
+    queue.submit(("s2", "sls"), blocking(release), owner=("a", "sls"))
+    wait_until(lambda: running.done())
+    assert running.state == "cancelled" and not shared.cancel_requested
+    assert queue.stats()["cancelled"] == 1
+
+
+def test_urgent_jobs_go_first(release):
+    queue = sm.JobQueue(workers=2, reserved=1)
+    order = []
+    heavy = queue.submit(("heavy",), blocking(release, order, "heavy"), priority=sm.PRIORITY_LOW)
+    wait_until(lambda: heavy.state == "running")
+    low = queue.submit(("low",), lambda: order.append("low"), priority=sm.PRIORITY_LOW)
+    normal = queue.submit(("normal",), lambda: order.append("normal"), priority=sm.PRIORITY_NORMAL)
+    # the reserved thread takes the high priority job while the heavy one runs
+    high = queue.submit(("high",), lambda: order.append("high"), priority=sm.PRIORITY_HIGH)
+    high.future.result(timeout=10)
+    assert low.state == normal.state == "pending"
+    release.set()
+    low.future.result(timeout=10)
+    assert order == ["heavy", "high", "normal", "low"]
+
+
+def test_analysis_in_flight_is_computed_once():
+    key = ("test_jobs", "analysis", ())
+    calls = []
+    start = threading.Barrier(3)
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.2)
+        return 42
+
+    def ask(results):
+        start.wait()
+        results.append(sm._computed_once(key, compute))
+
+    results = []
+    threads = [threading.Thread(target=ask, args=(results,)) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+    assert results == [42, 42, 42] and len(calls) == 1
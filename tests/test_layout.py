@@ -0,0 +1,47 @@
+"""
+rect_bar_array against the layer by layer layout it replaced
+"""
+import numpy as np
+import pandas as pd
+import pytest
+import sections_EC2_module as sm
+
+
+def layer_bars(name, diam, nr, cover, height, width):
+    """
+    the bars (area, x, y) of one layer, placed one at a time as before the
+    array layout; side layers are mirrored to -x
+    """
+    area = np.pi*diam**2/4
+    if area == 0 or nr == 0:
+        return []
+    if name.startswith("Side"):
+        s = (height-2*cover)/(nr+1)
+        x = -width/2+cover+(diam*1.2 if name.endswith("2") else 0)
+        ys = [-height/2+cover+i*s for i in range(1, nr+1)]
+        return [[area, xi, y] for y in ys for xi in (x, -x)]
+    s = (width-2*cover)/(nr-1)
+    offset = diam*1.2 if name.endswith("2") else 0
+    y = height/2-cover-offset if name.startswith("Top") else -height/2+cover+offset
+    return [[area, -width/2+cover+i*s, y] for i in range(nr)]
+
+
+@pytest.mark.parametrize("counts", [(4, 0, 4, 0, 2, 0), (5, 3, 6, 2, 1, 3), (2, 0, 8, 4, 0, 0)])
+def test_rect_bar_array_matches_layer_layout(counts):
+    rect_df = pd.DataFrame({"Bars diameter [mm]": [25, 20, 25, 25, 16, 12],
+                            "Number of bars": counts,
+                            "Cover [mm]": [50, 50, 50, 50, 45, 45]},
+                           index=sm.RECT_LAYERS)
+    height, width = 800, 400
+    expected = [bar for name, row in rect_df.iterrows()
+                for bar in layer_bars(name, row["Bars diameter [mm]"], row["Number of bars"],
+                                      row["Cover [mm]"], height, width)]
+    bars = sm.rect_bar_array(rect_df, height, width)
+    assert bars == pytest.approx(np.array(expected))
+    section = sm.concrete_section("Rectangular", bar_mat=sm.create_steelbar(450),
+                                  concrete_mat=sm.cached_concrete(30), height=height,
+                                  width=width, rect_df=rect_df)
+    # close bars of two layers are trimmed where they overlap, as before
+    lumped = section.reinf_geometries_lumped
+    assert len(lumped) == len(expected)
+    assert sum(geom.calculate_area() for geom in lumped) <= sum(a for a, _, _ in expected)*(1+1e-6)
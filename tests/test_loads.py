@@ -0,0 +1,37 @@
+"""
+Import and reduction of load combinations (sections_EC2_loads)
+"""
+import numpy as np
+import pandas as pd
+import pytest
+import sections_EC2_loads as sl
+import sections_EC2_module as sm
+
+
+def test_hull_reduction_keeps_governing_case(section, tmp_path):
+    rng = np.random.default_rng(19)
+    n = rng.uniform(-600, 3500, 2000)
+    m = rng.uniform(-250, 250, 2000)
+    uls_df = pd.DataFrame({"Load Case": [f"LC{i}" for i in range(len(n))],
+                           "N [kN]": n, "M [kNm]": m, "V [kN]": rng.uniform(0, 300, len(n))})
+    path = tmp_path / "member.csv"
+    uls_df.to_csv(path, index=False)
+    reduced, info = sl.load_actions(path, kind="uls", chunk_rows=300)
+    assert info["read"] == len(uls_df) and info["kept"] < 50
+
+    def governing(df):
+        check, info = sm.governing_uls_check(section, df["N [kN]"].to_numpy(dtype=float),
+                                             df["M [kNm]"].to_numpy(dtype=float),
+                                             load_cases=list(df["Load Case"]))
+        return info["governing"], info["utilisation"]
+
+    case, util = governing(reduced)
+    full_case, full_util = governing(uls_df)
+    assert case == full_case and util == pytest.approx(full_util)
+
+
+def test_unique_cases_numbers_repeated_names():
+    df = pd.DataFrame({"Load Case": ["LC1", "LC2", "LC1", "LC1"], "N [kN]": [0, 1, 2, 3]})
+    names = sl.unique_cases(df)["Load Case"]
+    assert list(names) == ["LC1", "LC2", "LC1 (2)", "LC1 (3)"]
+    assert list(df["Load Case"]) == ["LC1", "LC2", "LC1", "LC1"]
@@ -0,0 +1,48 @@
+"""
+EC2 material tables against the formulas of EC2 table 3.1
+"""
+import numpy as np
+import pandas as pd
+import pytest
+import sections_EC2_module as sm
+
+
+def concrete_series(fck):
+    """
+    the properties of one class as computed before the tables (one
+    pd.Series per call)
+    """
+    fcm = fck+8
+    fctm = 0.3*fck**(2/3) if fck <= 50 else 2.12*np.log(1+fcm/10)
+    return pd.Series({
+        "fck": fck, "fcm": fcm, "fctm": fctm, "fctk_05": 0.7*fctm, "fctk_95": 1.3*fctm,
+        "Ecm": 22*(fcm/10)**0.3*1000,
+        "eps_c1": min(0.7*fcm**0.31, 2.8)/1000,
+        "eps_cu1": 3.5/1000 if fck < 50 else (2.8+27*((98-fcm)/100)**4)/1000,
+        "eps_c2": 2.0/1000 if fck < 50 else (2+0.085*(fck-50)**0.53)/1000,
+        "eps_cu2": 3.5/1000 if fck < 50 else (2.6+35*((90-fck)/100)**4)/1000,
+        "n": 2.0 if fck < 50 else 1.4+23.4*((90-fck)/100)**4})
+
+
+@pytest.mark.parametrize("fck", [*sm.EC2_CLASSES, 32.0])
+def test_concrete_tables_match_formulas(fck):
+    expected = concrete_series(fck)
+    assert sm.concrete_EC2(fck).to_numpy() == pytest.approx(expected.to_numpy())
+    assert list(sm.concrete_props(fck).tolist()) == pytest.approx(list(expected))
+
+
+def test_concrete_hand_values():
+    # C30/37: fctm = 0.3*30^(2/3) = 2.90, Ecm = 22*3.8^0.3 = 32.8 GPa, eps_c1 = 0.7*38^0.31 = 2.16 permil
+    # C90/105: fctm = 2.12*ln(10.8) = 5.04, eps_cu2 = 2.6 permil, n = 1.4
+    c30, c90 = sm.concrete_props(30), sm.concrete_props(90)
+    assert (c30.fctm, c30.Ecm, c30.eps_c1, c30.eps_cu1) == pytest.approx((2.90, 32837, 2.16e-3, 3.5e-3),
+                                                                        rel=2e-3)
+    assert (c90.fctm, c90.eps_cu2, c90.n) == pytest.approx((5.04, 2.6e-3, 1.4), rel=2e-3)
+
+
+def test_vectorised_concrete_and_shared_materials():
+    table = sm.concrete_EC2(np.array([25.0, 60.0]))
+    assert table.loc[1].to_numpy() == pytest.approx(concrete_series(60.0).to_numpy())
+    assert not sm.EC2_CONCRETE_TABLE.flags.writeable
+    assert sm.cached_concrete(30) is sm.cached_concrete(30.0)
+    assert sm.cached_concrete(30) is not sm.cached_concrete(30, gamma_c=1.2)
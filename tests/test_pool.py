@@ -0,0 +1,36 @@
+"""
+run_analyses in the process pool against the same analyses run in-process
+"""
+import numpy as np
+import pandas as pd
+import pytest
+import sections_EC2_module as sm
+from conftest import rect_spec
+
+
+@pytest.fixture
+def pool():
+    yield 2
+    sm.shutdown_executor()
+
+
+def test_pool_results_match_serial_in_task_order(pool):
+    # different top and bottom layers: theta=0 and pi are separate tasks
+    bars = pd.DataFrame({"Bars diameter [mm]": [16, 25], "Number of bars": [3, 4],
+                         "Cover [mm]": [40, 40]}, index=["Top layer 1", "Bottom layer 1"])
+    spec = rect_spec(height=450, rect_df=bars, accuracy="draft")
+    tasks = [(spec, "moment_interaction_diagram", {"theta": np.pi}),
+             (spec, "fibre_moment_curvature", {"theta": 0, "n": 300e3}),
+             (spec, "moment_interaction_diagram", {"theta": 0})]
+    results = sm.run_analyses(tasks, max_workers=pool)
+    for (spec_i, analysis, kwargs), result in zip(tasks, results):
+        expected = sm.run_analysis(spec_i, analysis, kwargs)
+        if analysis == "fibre_moment_curvature":
+            assert result.kappa == pytest.approx(expected.kappa)
+            assert result.m_xy == pytest.approx(expected.m_xy)
+        else:
+            assert [r.m_xy for r in result.results] == pytest.approx([r.m_xy for r in expected.results])
+            assert [r.n for r in result.results] == pytest.approx([r.n for r in expected.results])
+    # the two directions differ, so the order of the results is checked too
+    m_max = [max(abs(r.m_xy) for r in results[i].results) for i in (0, 2)]
+    assert m_max[0] != pytest.approx(m_max[1])
@@ -0,0 +1,25 @@
+"""
+incremental section rebuilds against a fresh build
+"""
+import pytest
+import sections_EC2_module as sm
+
+from conftest import RECT_BARS, rect_spec
+
+
+@pytest.mark.parametrize("edit", [{"fck": 40},
+                                  {"rect_df": RECT_BARS.assign(**{"Number of bars": [4, 2, 1]})},
+                                  {"height": 600}])
+def test_incremental_rebuild_matches_fresh_build(edit):
+    base = rect_spec()
+    sm.section_cache.clear()
+    sm.cached_section(base)
+    edited = rect_spec(**edit)
+    rebuilt = sm.cached_section(edited)
+    fresh = edited.build()
+    for name in ("concrete_area", "reinf_lumped_area", "e_a", "e_qx", "e_qy", "e_ixx_c", "e_iyy_c"):
+        assert getattr(rebuilt.gross_properties, name) == pytest.approx(
+            getattr(fresh.gross_properties, name), rel=1e-9)
+    assert sm.bar_arrays(rebuilt)[0] == pytest.approx(sm.bar_arrays(fresh)[0])
+    assert rebuilt.ultimate_bending_capacity(n=5e5).m_x == pytest.approx(
+        fresh.ultimate_bending_capacity(n=5e5).m_x, rel=1e-6)
@@ -0,0 +1,24 @@
+"""
+sls_batch against calculate_cracked_stress of each case
+"""
+import numpy as np
+import pandas as pd
+import pytest
+import sections_EC2_module as sm
+
+
+def test_sls_batch_matches_cracked_stress(spec, section):
+    sls_df = pd.DataFrame({"Load Case": ["S1", "S2", "S3"],
+                           "N [kN]": [300.0, 0.0, -50.0],
+                           "M [kNm]": [120.0, -80.0, 60.0]})
+    result = sm.sls_batch(spec, sls_df)
+    for i, row in sls_df.iterrows():
+        theta = 0 if row["M [kNm]"] > 0 else np.pi
+        cracked = section.calculate_cracked_properties(theta=theta)
+        stress = section.calculate_cracked_stress(cracked_results=cracked,
+                                                  n=row["N [kN]"]*1e3,
+                                                  m=abs(row["M [kNm]"])*1e6)
+        bar = min(stress.lumped_reinforcement_stresses)
+        conc = max(np.max(s) for s in stress.concrete_stresses)
+        assert result["Min bar stress [MPa]"][i] == pytest.approx(bar, abs=0.1)
+        assert result["Max concrete stress [MPa]"][i] == pytest.approx(conc, abs=0.1)
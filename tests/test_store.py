@@ -0,0 +1,24 @@
+"""
+On-disk result store: results of other versions are never read back
+"""
+import sections_EC2_module as sm
+
+
+def test_store_version_follows_accuracy_tiers(monkeypatch):
+    version = sm.store_version()
+    monkeypatch.setitem(sm.ACCURACY_TIERS["draft"], "tol", 0.03)
+    assert sm.store_version() != version
+
+
+def test_other_versions_are_ignored_until_pruned(tmp_path):
+    path = str(tmp_path / "results.sqlite")
+    key = ("section", "adaptive_interaction_diagram", (("theta", 0.0),))
+    old = sm.ResultStore(path)
+    old.version = "old"
+    old.put(key, [1.0, 2.0])
+    store = sm.ResultStore(path)
+    assert store.get(key) is None
+    store.put(key, [3.0])
+    assert old.get(key) == [1.0, 2.0] and store.get(key) == [3.0]
+    assert store.prune() == 1
+    assert old.get(key) is None and store.get(key) == [3.0]
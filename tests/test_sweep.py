@@ -0,0 +1,34 @@
+"""
+design_sweep against the check of every candidate
+"""
+import numpy as np
+import pandas as pd
+import sections_EC2_module as sm
+
+
+def test_design_sweep_front_matches_full_check():
+    # 400x500 and 500x400 have the same areas: ties are checked, not skipped
+    specs = sm.sweep_specs(heights=[400, 500, 600], widths=[400, 500], diameters=[16, 20],
+                           counts=[3], fcks=[25, 30])
+    uls_df = pd.DataFrame({"Load Case": ["LC1", "LC2"], "N [kN]": [1500.0, -100.0],
+                           "M [kNm]": [150.0, -120.0], "V [kN]": [0.0, 0.0]})
+    df = sm.design_sweep(specs, uls_df, max_workers=1)
+    n, m = uls_df["N [kN]"].to_numpy(), uls_df["M [kNm]"].to_numpy()
+    util = np.array([sm.uls_utilisation(spec, n, m) for spec in specs])
+    passed = util <= 1
+    assert passed.any() and not passed.all()
+
+    assert (df["Status"] == "dominated").any()
+    checked = df["Status"].isin(["pass", "fail"]).to_numpy()
+    assert np.array_equal(df["Status"].to_numpy()[checked] == "pass", passed[checked])
+    areas = df[["As [mm2]", "Ac [mm2]"]].to_numpy()
+    for i in np.flatnonzero(~checked):
+        if df["Status"].iloc[i] == "dominated":
+            # skipped only if strictly dominated by a passing section
+            better = (areas <= areas[i]).all(axis=1) & (areas < areas[i]).any(axis=1)
+            assert (better & (df["Status"] == "pass").to_numpy()).any()
+        else:
+            assert not passed[i]
+
+    front = areas[passed][sm.pareto_mask(areas[passed, 0], areas[passed, 1])]
+    assert set(map(tuple, areas[df["Pareto"].to_numpy()])) == set(map(tuple, front))
@@ -0,0 +1,21 @@
+"""
+analyses derived by symmetry against the direct analyses
+"""
+import numpy as np
+import pytest
+import sections_EC2_module as sm
+
+
+def test_mirrored_results_match_direct(spec, section):
+    assert sm.section_symmetries(spec)
+    mirrored = sm.cached_analysis(spec, "moment_interaction_diagram", theta=np.pi)
+    direct = section.moment_interaction_diagram(theta=np.pi, n_points=24, progress_bar=False)
+    n_m, m_m = sm.interaction_curve(mirrored)
+    n_d, m_d = sm.interaction_curve(direct)
+    assert n_m == pytest.approx(n_d, rel=1e-6)
+    assert m_m == pytest.approx(m_d, rel=1e-6, abs=1e-3*m_d.max())
+
+    mirrored = sm.cached_analysis(spec, "ultimate_bending_capacity", theta=np.pi, n=5e5)
+    direct = section.ultimate_bending_capacity(theta=np.pi, n=5e5)
+    assert mirrored.m_x == pytest.approx(direct.m_x, rel=1e-6)
+    assert mirrored.m_xy == pytest.approx(direct.m_xy, rel=1e-6)
@@ -0,0 +1,47 @@
+"""
+tiered_uls_check: the cases close to 1 are checked again at the final tier
+"""
+import warnings
+from dataclasses import replace
+import numpy as np
+import pytest
+import sections_EC2_module as sm
+
+
+def test_tiered_check_escalates_cases_close_to_one():
+    spec = sm.section_spec("Circular", fck=30, fy=450, circ_diameter=500, circ_cover=50,
+                           circ_n_bars=8, circ_d_bars=20, accuracy="draft")
+    final = sm.cached_section(replace(spec, accuracy="final"))
+    n, m, factor = [], [], []
+    for n_i in (500.0, 1500.0):
+        mrd = final.ultimate_bending_capacity(theta=0.0, n=n_i*1e3).m_xy/1e6
+        for f in (0.5, 0.98, 1.02, 1.5):
+            n.append(n_i)
+            m.append(f*mrd)
+            factor.append(f)
+    # beyond the tensile capacity: infinite utilisation, never escalated
+    n.append(-5000.0)
+    m.append(10.0)
+    factor.append(np.inf)
+    factor = np.array(factor)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", RuntimeWarning)
+        df, info = sm.tiered_uls_check(spec, np.array(n), np.array(m))
+
+    near = np.abs(factor-1) < 0.05
+    assert np.array_equal(df["Check"].to_numpy() == "final", near)
+    assert df["Utilization Level"].to_numpy()[near] == pytest.approx(factor[near], rel=1e-3)
+    assert (df["Accuracy"][~near] == "draft").all()
+    assert np.isinf(df["Utilization Level"].iloc[-1]) and df["Error estimate"].iloc[-1] == 0
+    assert info["final reruns"] == near.sum()
+    assert type(info["error estimate"]) is float and type(info["observed error"]) is float
+    assert 0 < info["error estimate"] < 0.05
+
+
+def test_tiered_check_without_error_estimate(spec):
+    # rectangular sections have no error estimate: inf*0 must not warn
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", RuntimeWarning)
+        df, info = sm.tiered_uls_check(spec, np.array([-5000.0, 0.0]), np.array([10.0, 100.0]))
+    assert list(df["Error estimate"]) == [0.0, 0.0] and info["error estimate"] == 0.0